@@ -1,6 +1,6 @@
 import os
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -9,11 +9,80 @@ class Settings(BaseSettings):
     webhook_secret: str = os.getenv("WEBHOOK_SECRET", "supersecret")  # Use env var with fallback
 
     # === Webhook Configuration ===
-    webhook_url: str = "http://localhost:8000/webhook/github"
+    webhook_url: str = "http://localhost:8000/deploy/webhook/github"  # The route that redeploys on push
+    webhook_registry_path: Optional[str] = None  # JSON file to persist confirmed webhooks across restarts
 
     # === Deployment Configuration ===
     deployment_dir: str = "/tmp/deployments"
 
+    # === OpenAI Configuration ===
+    openai_chat_timeout: float = 30.0  # Seconds allowed for a chat completion
+    openai_extraction_timeout: float = 15.0  # Seconds allowed for deployment info extraction
+    openai_max_retries: int = 2
+    llm_provider: str = "openai"  # "openai" or "stub" (deterministic local model for load tests)
+    stub_llm_latency: float = 0.5  # Seconds before the stub model answers
+    stub_llm_token_latency: float = 0.02  # Seconds between streamed stub tokens
+
+    # === LLM Admission Control ===
+    llm_max_concurrency: int = 8  # LLM calls allowed in flight at once
+    llm_max_queue: int = 32  # Calls allowed to wait for a slot before requests are shed with 429
+    llm_max_queue_per_client: int = 4  # Waiting calls allowed per client
+    llm_queue_timeout: float = 10.0  # Seconds a call may wait for a slot
+    trusted_proxy_count: int = 1  # Proxies in front of the app that append to X-Forwarded-For (0 ignores the header)
+
+    # === Chat Conversation Store ===
+    chat_max_conversations: int = 10000  # Least recently used conversations are evicted beyond this
+    chat_conversation_ttl: int = 86400  # Seconds a conversation may sit idle before it is dropped
+    chat_max_total_chars: int = 50_000_000  # Memory cap across all stored message text
+    chat_context_token_budget: int = 1000  # Tokens of recent turns sent to the model
+    chat_summary_token_budget: int = 200  # Tokens kept in the running summary of older turns
+
+    # === AI Extraction Cache ===
+    extraction_cache_size: int = 1024  # Max cached prompts (least recently used are evicted)
+    extraction_cache_ttl: int = 3600  # Seconds before a cached extraction expires
+    extraction_cache_path: Optional[str] = None  # JSON file to persist the cache across restarts
+    extraction_cache_save_delay: float = 5.0  # Seconds new entries may wait before being written together
+
+    # === Redeploy Filter ===
+    # Pushes that only change paths matching these patterns don't trigger a redeploy
+    redeploy_ignore_paths: List[str] = ["*.md", "*.rst", "docs/*", "LICENSE*", ".github/*", ".gitignore"]
+    # Per-repository overrides, e.g. {"owner/repo": {"include": ["backend/*"], "ignore": ["*.md"]}}
+    redeploy_path_rules: Dict[str, Dict[str, List[str]]] = {}
+
+    # === Duplicate Deployment Requests ===
+    idempotency_key_ttl: int = 86400  # Seconds a deployment response is replayed for a repeated Idempotency-Key
+    idempotency_max_keys: int = 10000  # Oldest keys are dropped beyond this
+
+    # === Deployment Status Polling ===
+    deploy_poll_min_interval: float = 2.0  # Shortest wait between status checks (used near the expected finish)
+    deploy_poll_max_interval: float = 30.0  # Longest wait between status checks
+    deploy_timeout_default: float = 900.0  # Seconds to wait for a deployment with no duration history
+    deploy_timeout_min: float = 120.0  # Bounds on the timeout derived from duration history
+    deploy_timeout_max: float = 3600.0
+    deploy_history_path: Optional[str] = None  # JSON file to persist deployment durations across restarts
+
+    # === App Detection ===
+    detect_max_depth: int = 3  # Directory levels searched for apps when the repository root isn't one
+    detect_max_dirs: int = 2000  # Directories examined at most, keeping detection time bounded
+    detect_concurrency: int = 8  # Directories examined in parallel
+
+    # === Admin Endpoints ===
+    # Profiles and stack dumps are only served with "X-Admin-Token: <token>"; without a token they are disabled
+    admin_token: Optional[str] = None
+
+    # === Request Profiling ===
+    profiler_enabled: bool = False  # Sample stacks of every request and keep profiles of slow ones
+    profiler_slow_ms: float = 1000.0  # Requests slower than this are profiled
+    profiler_interval_ms: float = 5.0  # Time between stack samples
+    profiler_allow_header: bool = False  # Let admins request a profile with "X-Profile: 1" (needs X-Admin-Token too)
+    profiler_output_dir: str = "/tmp/infraagent-profiles"
+    profiler_max_profiles: int = 50  # Older profile files are deleted beyond this
+
+    # === Event Loop Monitoring ===
+    loop_monitor_enabled: bool = False  # Watch for blocking calls that stall the event loop
+    loop_stall_threshold_ms: float = 100.0  # Loop lag that counts as a stall (its stack is captured)
+    loop_monitor_interval_ms: float = 50.0  # Heartbeat period used to measure loop lag
+
     # === App Configuration ===
     environment: str = "development"
     debug: bool = True  # NOTE: Use 0/1 or true/false in .env
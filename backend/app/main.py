@@ -1,11 +1,36 @@
+import time
+STARTED_AT = time.perf_counter()
+
 from dotenv import load_dotenv
 load_dotenv()  # Load environment variables from .env first
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import deploy, webhook, chat
+from app.routers import deploy, webhook, chat, admin
+from app.utils.openai_client import warm_up_openai_client, close_openai_client
+from app.utils.llm_limiter import llm_admission, ClientIdentityMiddleware
+from app.utils.request_metrics import RequestMetricsMiddleware
+from app.utils.loop_monitor import loop_monitor
+from app.utils.extraction_cache import extraction_cache
+from app.config import settings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared OpenAI client in the background so /health is served immediately;
+    # all requests then reuse its connection pool
+    warm_up = asyncio.create_task(warm_up_openai_client())
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
+    print(f"⚡ InfraAgent ready in {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms")
+    yield
+    await loop_monitor.stop()
+    await warm_up
+    await close_openai_client()
+    await asyncio.to_thread(extraction_cache.flush)  # Write entries still waiting for a debounced save
 
-app = FastAPI(title="InfraAgent", version="1.0.0")
+app = FastAPI(title="InfraAgent", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware here
 origins = [
@@ -24,10 +49,17 @@ app.add_middleware(
     allow_headers=["*"],        # Allow all headers
 )
 
+# Identify callers so queued LLM calls are shared fairly between clients
+app.add_middleware(ClientIdentityMiddleware)
+
+# Time every request (outermost, so middleware time is included)
+app.add_middleware(RequestMetricsMiddleware)
+
 # Include route modules
 app.include_router(deploy.router, prefix="/deploy")
 app.include_router(webhook.router, prefix="/webhook")
 app.include_router(chat.router, prefix="/chat")
+app.include_router(admin.router, prefix="/admin")
 
 @app.get("/")
 def root():
@@ -37,3 +69,6 @@ def root():
 def health_check():
     return {"status": "healthy", "service": "InfraAgent API"}
 
+@app.get("/stats/llm")
+def llm_stats():
+    return llm_admission.get_stats()
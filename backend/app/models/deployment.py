@@ -37,10 +37,14 @@ class ChatResponse(BaseModel):
     needs_input: bool = False
     input_type: Optional[str] = None  # "repo_url", "environment", etc.
     suggestions: Optional[List[str]] = None
+    slots: Optional[dict] = None  # Deployment details collected so far: repo_url, environment, deployment_type
 
 class DeploymentRequest(BaseModel):
     prompt: str  # Only require the user's natural language prompt
 
+class ConversationDeploymentRequest(BaseModel):
+    conversation_id: str  # Chat conversation whose collected slots describe the deployment
+
 class DeploymentResponse(BaseModel):
     deployment_id: str
     status: str
@@ -52,6 +56,8 @@ class BuildLog(BaseModel):
     level: str  # "info", "warning", "error"
     message: str
     step: str  # "cloning", "building", "deploying"
+    count: int = 1  # Consecutive identical lines collapsed into this entry
+    last_timestamp: Optional[datetime] = None  # Time of the last repeat when count > 1
 
 class DeploymentRecord(BaseModel):
     id: str
@@ -69,16 +75,48 @@ class DeploymentRecord(BaseModel):
     deployment_url: Optional[str] = None
     build_logs: List[BuildLog] = []
     render_service_id: Optional[str] = None
+    render_deploy_id: Optional[str] = None  # Provider deploy (build) this deployment activated
+    app_type: Optional[str] = None  # App type detected from the repository
+    build_plan: Optional[dict] = None  # Build/start commands derived from the repository's lockfiles
+    commit_sha: Optional[str] = None  # Commit that went live
+    promoted_from: Optional[str] = None  # Deployment whose commit was promoted to this environment
+    rollback_of: Optional[str] = None  # Deployment this one rolled back (its service's previous build was re-activated)
     webhook_configured: bool = False
 
 class DeploymentListResponse(BaseModel):
     deployments: List[DeploymentRecord]
     total: int
 
+class BatchStatusRequest(BaseModel):
+    deployment_ids: List[str]
+
+class BatchStatusResponse(BaseModel):
+    deployments: List[DeploymentRecord]
+    missing: List[str]  # Requested IDs with no deployment
+
+class BatchTarget(BaseModel):
+    repo_url: Optional[str] = None  # Defaults to the repository extracted from the batch prompt
+    environment: Environment
+
+    class Config:
+        use_enum_values = True  # Keep environment a plain string like the rest of the records
+
+class BatchDeploymentRequest(BaseModel):
+    prompt: Optional[str] = None  # Shared description, extracted once for all targets
+    targets: List[BatchTarget]
+
+class BatchDeploymentResponse(BaseModel):
+    deployments: List[DeploymentResponse]
+    extracted_info: dict
+
 class RollbackRequest(BaseModel):
     deployment_id: str
     reason: Optional[str] = None
 
+class PromotionRequest(BaseModel):
+    deployment_id: str  # Successful deployment to promote
+    target_environment: Optional[str] = None  # Defaults to the next environment: dev -> qa -> beta -> prod
+
 class WebhookPayload(BaseModel):
     ref: str
     repository: dict
@@ -0,0 +1,76 @@
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from typing import Optional
+from app.config import settings
+from app.utils.request_metrics import request_metrics, request_profiler
+from app.utils.loop_monitor import loop_monitor
+
+router = APIRouter()
+
+def is_admin_token(token: Optional[str]) -> bool:
+    return bool(settings.admin_token and token and hmac.compare_digest(token.encode(), settings.admin_token.encode()))
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """
+    Guard for endpoints that expose stack traces and file paths or change process-wide debugging:
+    disabled unless ADMIN_TOKEN is configured, and then only for requests carrying it.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid or missing admin token")
+
+class ProfilerSettings(BaseModel):
+    enabled: bool
+    threshold_ms: Optional[float] = None
+
+@router.get("/metrics/requests")
+async def get_request_metrics():
+    """Get latency histograms and status codes per route, slowest total time first"""
+    return request_metrics.get_stats()
+
+@router.get("/metrics/loop", dependencies=[Depends(require_admin_token)])
+async def get_loop_metrics():
+    """Get event loop lag, stall counts and the stacks of recent stalls"""
+    return loop_monitor.get_stats()
+
+@router.post("/loop-monitor", dependencies=[Depends(require_admin_token)])
+async def configure_loop_monitor(enabled: bool):
+    """Start or stop the event loop stall monitor at runtime"""
+    if enabled:
+        loop_monitor.start()
+    else:
+        await loop_monitor.stop()
+    return {"running": loop_monitor.running}
+
+@router.get("/profiles", dependencies=[Depends(require_admin_token)])
+async def list_profiles():
+    """List recent profiles of slow (or explicitly profiled) requests, newest first"""
+    return {
+        "enabled": request_profiler.enabled,
+        "threshold_ms": request_profiler.threshold_ms,
+        "profiles": request_profiler.get_profiles()
+    }
+
+@router.get("/profiles/{index}", response_class=PlainTextResponse, dependencies=[Depends(require_admin_token)])
+async def get_profile(index: int):
+    """Get a profile in collapsed-stack format (0 is the most recent)"""
+    profiles = request_profiler.get_profiles()
+    if index < 0 or index >= len(profiles) or not profiles[index]["path"]:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    try:
+        with open(profiles[index]["path"], "r") as f:
+            return f.read()
+    except OSError:
+        raise HTTPException(status_code=404, detail="Profile file no longer exists")
+
+@router.post("/profiler", dependencies=[Depends(require_admin_token)])
+async def configure_profiler(request: ProfilerSettings):
+    """Turn slow-request profiling on or off at runtime"""
+    request_profiler.enabled = request.enabled
+    if request.threshold_ms is not None:
+        request_profiler.threshold_ms = request.threshold_ms
+    print(f"🔬 Request profiler {'enabled' if request.enabled else 'disabled'} (threshold {request_profiler.threshold_ms} ms)")
+    return {"enabled": request_profiler.enabled, "threshold_ms": request_profiler.threshold_ms}
@@ -1,6 +1,10 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from app.models.deployment import ChatRequest, ChatResponse
-from app.services.chat_service import process_chat_message
+from app.services.chat_service import process_chat_message, stream_chat_message, conversation_manager
+from app.utils.llm_limiter import llm_admission, LLMOverloadedError
 
 router = APIRouter()
 
@@ -16,11 +20,61 @@ async def chat(request: ChatRequest):
                 detail="Please provide a message to chat with the AI."
             )
         
-        response = process_chat_message(request)
+        response = await process_chat_message(request)
         return response
         
+    except LLMOverloadedError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error processing chat message: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Chat with the AI assistant, streaming the reply as Server-Sent Events.
+    Emits "start", then "token" events as the model produces text, then a final
+    "done" event with needs_input, input_type and suggestions.
+    """
+    if not request.message or not request.message.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Please provide a message to chat with the AI."
+        )
+    
+    # Admit before streaming starts so overload can still be answered with a 429
+    try:
+        permit = await llm_admission.acquire()
+    except LLMOverloadedError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    async def event_stream():
+        try:
+            async for event in stream_chat_message(request):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            permit.release()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(permit.release)  # Backstop if the stream never starts
+    )
+
+@router.get("/stats")
+async def chat_stats():
+    """Get conversation store size and eviction counters"""
+    return conversation_manager.get_stats()
@@ -1,18 +1,56 @@
-from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi import APIRouter, HTTPException, Header, Query, Request, Response
 from typing import Optional
-from app.models.deployment import DeploymentRequest, DeploymentResponse, DeploymentListResponse, WebhookPayload
-from app.services.deploy_service import create_deployment
+from datetime import datetime
+import json
+import zlib
+from app.models.deployment import (
+    DeploymentRequest, DeploymentResponse, DeploymentListResponse, WebhookPayload, ConversationDeploymentRequest,
+    BatchStatusRequest, BatchStatusResponse, BatchDeploymentRequest, BatchDeploymentResponse, RollbackRequest,
+    PromotionRequest
+)
+from app.services.deploy_service import create_deployment, create_deployment_from_conversation, create_batch_deployment, rollback_deployment, promote_deployment, DeploymentConflictError
+from app.services.chat_service import conversation_manager
 from app.services.deployment_storage import deployment_storage
 from app.services.render_deployment import render_deployment_service
-import requests
+from app.services.redeploy_filter import redeploy_filter
+from app.utils.ai_prompt import get_extraction_stats
+from app.routers.webhook import verify_signature
+from app.utils.github import handle_hook_event
+from app.utils.idempotency import deploy_idempotency, in_flight_deployments, IdempotencyConflictError
+from app.utils.llm_limiter import LLMOverloadedError
 
 router = APIRouter()
 
+MAX_BATCH_STATUS_IDS = 200
+MAX_BATCH_TARGETS = 20
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def _set_etag(response: Response, etag: str):
+    # no-cache makes browsers revalidate with If-None-Match on every fetch
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+def _collection_etag(*params) -> str:
+    """ETag for a collection view: the storage-wide version plus a hash of the query"""
+    query = zlib.crc32("|".join(str(p) for p in params).encode())
+    return f'"{deployment_storage.epoch}.c{deployment_storage.collection_version}-{query:08x}"'
+
 @router.post("/")
-async def deploy(request: DeploymentRequest):
+async def deploy(request: DeploymentRequest, response: Response, idempotency_key: Optional[str] = Header(None)):
     """
     Create a deployment using AI to extract all necessary information from the user's prompt.
     The user only needs to provide a natural language description of what they want to deploy.
+    Retries with the same Idempotency-Key header get the original deployment's response.
     """
     try:
         print(f"🚀 Deployment request received: {request.prompt}")
@@ -25,12 +63,28 @@ async def deploy(request: DeploymentRequest):
                 detail="Please provide a description of what you want to deploy."
             )
         
-        # Create deployment using AI extraction
-        print("🤖 Starting AI extraction...")
-        result = await create_deployment(request=request)
+        if idempotency_key:
+            result, replayed = await deploy_idempotency.run(
+                idempotency_key, request.prompt, lambda: create_deployment(request=request)
+            )
+            if replayed:
+                print(f"♻️ Replaying deployment {result.deployment_id} for Idempotency-Key {idempotency_key}")
+                response.headers["Idempotent-Replayed"] = "true"
+                return result
+        else:
+            # Create deployment using AI extraction
+            print("🤖 Starting AI extraction...")
+            result = await create_deployment(request=request)
         print(f"✅ Deployment result: {result}")
         return result
         
+    except DeploymentConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except LLMOverloadedError as e:
+        print(f"⏳ Deployment request shed: {str(e)}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except ValueError as e:
         print(f"❌ ValueError in deployment: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -40,34 +94,163 @@ async def deploy(request: DeploymentRequest):
         print(f"❌ Exception in deployment: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@router.post("/from-conversation")
+async def deploy_from_conversation(request: ConversationDeploymentRequest):
+    """
+    Create a deployment from the repository, environment and type a chat conversation
+    has already collected, skipping AI extraction entirely.
+    """
+    if conversation_manager.get_slots(request.conversation_id) is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
+    try:
+        return await create_deployment_from_conversation(request.conversation_id)
+    except DeploymentConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Exception in conversation deployment: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/batch", response_model=BatchDeploymentResponse)
+async def deploy_batch(request: BatchDeploymentRequest):
+    """
+    Deploy to several (repository, environment) targets in one request.
+    The optional prompt is extracted once and each repository is cloned once.
+    """
+    if not request.targets:
+        raise HTTPException(status_code=400, detail="Please provide at least one deployment target.")
+    if len(request.targets) > MAX_BATCH_TARGETS:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {MAX_BATCH_TARGETS} targets.")
+    
+    try:
+        return await create_batch_deployment(request)
+    except LLMOverloadedError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        print(f"❌ Exception in batch deployment: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/rollback", response_model=DeploymentResponse)
+async def rollback(request: RollbackRequest):
+    """
+    Roll a deployment's service back to its previous successful deploy.
+    The earlier build is re-activated on Render, so nothing is cloned or rebuilt.
+    """
+    try:
+        return await rollback_deployment(request)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Exception in rollback: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/promote", response_model=DeploymentResponse)
+async def promote(request: PromotionRequest):
+    """
+    Promote a successful deployment's commit to the next (or a given) environment
+    without cloning or analyzing the repository again.
+    """
+    try:
+        return await promote_deployment(request)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Exception in promotion: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/status:batch", response_model=BatchStatusResponse)
+async def get_deployment_status_batch(request: BatchStatusRequest):
+    """Get the status of many deployments in one request"""
+    if len(request.deployment_ids) > MAX_BATCH_STATUS_IDS:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {MAX_BATCH_STATUS_IDS} deployment IDs.")
+    
+    deployments = []
+    missing = []
+    for deployment_id in dict.fromkeys(request.deployment_ids):
+        deployment = deployment_storage.get_deployment(deployment_id)
+        if deployment:
+            deployments.append(deployment_storage.with_build_logs(deployment))
+        else:
+            missing.append(deployment_id)
+    
+    return BatchStatusResponse(deployments=deployments, missing=missing)
+
 @router.get("/status/{deployment_id}")
-async def get_deployment_status(deployment_id: str):
+async def get_deployment_status(deployment_id: str, request: Request, response: Response):
     """Get the status of a specific deployment"""
     deployment = deployment_storage.get_deployment(deployment_id)
     if not deployment:
         raise HTTPException(status_code=404, detail="Deployment not found")
-    return deployment
+    
+    etag = f'"{deployment_storage.epoch}.d{deployment_storage.get_version(deployment_id)}-{deployment_id}"'
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    _set_etag(response, etag)
+    return deployment_storage.with_build_logs(deployment)
+
+@router.get("/logs/search")
+async def search_deployment_logs(
+    q: str = Query(..., min_length=1, description="Words that must all appear in the log line"),
+    environment: Optional[str] = Query(None, description="Filter by environment"),
+    since: Optional[datetime] = Query(None, description="Only lines logged at or after this time (UTC)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of matching lines")
+):
+    """Search build logs across all deployments, most recent matches first"""
+    if since and since.tzinfo:
+        since = since.replace(tzinfo=None) - since.utcoffset()
+    
+    results = deployment_storage.search_build_logs(q, environment=environment, since=since, limit=limit)
+    return {
+        "query": q,
+        "deployments": results,
+        "total_matches": sum(len(r["matches"]) for r in results)
+    }
 
 @router.get("/logs/{deployment_id}")
-async def get_deployment_logs(deployment_id: str):
+async def get_deployment_logs(deployment_id: str, request: Request, response: Response):
     """Get build logs for a specific deployment"""
     deployment = deployment_storage.get_deployment(deployment_id)
     if not deployment:
         raise HTTPException(status_code=404, detail="Deployment not found")
     
+    etag = f'"{deployment_storage.epoch}.l{deployment_storage.get_version(deployment_id)}-{deployment_id}"'
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    _set_etag(response, etag)
+    
+    build_logs = deployment_storage.get_build_logs(deployment_id)
     return {
         "deployment_id": deployment_id,
         "status": deployment.status,
-        "build_logs": deployment.build_logs,
-        "total_logs": len(deployment.build_logs)
+        "build_logs": build_logs,
+        "total_logs": len(build_logs)
     }
 
 @router.post("/webhook/github")
-async def github_webhook(request: Request):
+async def github_webhook(
+    request: Request,
+    x_hub_signature_256: str = Header(None),
+    x_github_event: str = Header(None)
+):
     """Handle GitHub webhook for automatic redeployment"""
+    # Payloads pick the commit that gets built, so only GitHub may send them
+    body = await request.body()
+    if not verify_signature(body, x_hub_signature_256):
+        raise HTTPException(status_code=403, detail="Invalid signature")
+    
     try:
         # Get the webhook payload
-        payload = await request.json()
+        payload = json.loads(body)
+        
+        # Our hook being deleted invalidates the webhook registry
+        if handle_hook_event(x_github_event, payload):
+            return {"message": "Webhook deletion recorded"}
         
         # Validate payload structure
         if not payload or 'repository' not in payload or 'head_commit' not in payload:
@@ -75,9 +258,11 @@ async def github_webhook(request: Request):
         
         # Extract repository information with validation
         try:
-            repo_url = f"https://github.com/{payload['repository']['full_name']}"
+            repo_name = payload['repository']['full_name']
+            repo_url = f"https://github.com/{repo_name}"
             commit_message = payload['head_commit']['message']
             commit_id = payload['head_commit']['id']
+            commits = payload.get('commits') or []
         except KeyError as e:
             raise HTTPException(status_code=400, detail=f"Missing required field in webhook payload: {str(e)}")
         
@@ -95,6 +280,23 @@ async def github_webhook(request: Request):
             print(f"❌ No Render service ID found for deployment: {latest_deployment.id}")
             return {"message": "No Render service ID found"}
         
+        # A signed delivery here confirms the repository's hook targets this route,
+        # so builds can go only through this filter, not through Render's own auto-deploy
+        await render_deployment_service.disable_auto_deploy(latest_deployment.render_service_id)
+        
+        # Skip pushes that wouldn't change what is deployed
+        skip_reason = redeploy_filter.check(repo_name, latest_deployment.render_service_id, commit_id, commits)
+        if skip_reason:
+            print(f"⏭️ Skipping redeployment for {latest_deployment.id}: {skip_reason}")
+            redeploy_filter.record_skip(repo_name, latest_deployment.render_service_id, commit_id, skip_reason)
+            deployment_storage.add_build_log(
+                latest_deployment.id,
+                "info",
+                f"⏭️ Redeployment skipped for commit {commit_id[:7]} ({skip_reason.replace('_', ' ')})",
+                "webhook"
+            )
+            return {"message": "Redeployment skipped", "reason": skip_reason}
+        
         # Trigger redeployment
         print(f"🔄 Triggering redeployment for {latest_deployment.id}")
         
@@ -106,33 +308,34 @@ async def github_webhook(request: Request):
             "webhook"
         )
         
-        # Trigger new deployment on Render
-        headers = {
-            "Authorization": f"Bearer {render_deployment_service.render_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.post(
-            f"{render_deployment_service.render_api_base}/services/{latest_deployment.render_service_id}/deploys",
-            headers=headers
-        )
-        
-        if response.status_code == 201:
-            deployment_storage.add_build_log(
-                latest_deployment.id,
-                "info",
-                "✅ Redeployment triggered successfully",
-                "webhook"
-            )
-            return {"message": "Redeployment triggered successfully"}
-        else:
+        # Trigger new deployment of the pushed commit on Render
+        service_id = latest_deployment.render_service_id
+        try:
+            render_deploy_id = await render_deployment_service.trigger_redeploy(service_id, commit_id)
+        except Exception as e:
             deployment_storage.add_build_log(
                 latest_deployment.id,
                 "error",
-                f"❌ Failed to trigger redeployment: {response.text}",
+                f"❌ {str(e)}",
                 "webhook"
             )
             return {"message": "Failed to trigger redeployment"}
+        
+        redeploy_filter.record_trigger(service_id, commit_id)
+        render_deployment_service.watch_redeploy(
+            service_id,
+            render_deploy_id,
+            commit_id,
+            latest_deployment.id,
+            (latest_deployment.repo_url, latest_deployment.app_type or "", latest_deployment.environment)
+        )
+        deployment_storage.add_build_log(
+            latest_deployment.id,
+            "info",
+            "✅ Redeployment triggered successfully",
+            "webhook"
+        )
+        return {"message": "Redeployment triggered successfully"}
             
     except Exception as e:
         print(f"❌ Error processing webhook: {str(e)}")
@@ -140,11 +343,18 @@ async def github_webhook(request: Request):
 
 @router.get("/list")
 async def list_deployments(
+    request: Request,
+    response: Response,
     limit: int = Query(50, ge=1, le=100, description="Number of deployments to return"),
     repo_url: Optional[str] = Query(None, description="Filter by repository URL"),
     environment: Optional[str] = Query(None, description="Filter by environment")
 ):
     """Get a list of all deployments with optional filtering"""
+    etag = _collection_etag("list", limit, repo_url, environment)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    _set_etag(response, etag)
+    
     if repo_url:
         deployments = deployment_storage.get_deployments_by_repo(repo_url)
     elif environment:
@@ -153,16 +363,39 @@ async def list_deployments(
         deployments = deployment_storage.get_all_deployments(limit)
     
     return DeploymentListResponse(
-        deployments=deployments,
+        deployments=[deployment_storage.with_build_logs(d) for d in deployments],
         total=len(deployments)
     )
 
 @router.get("/recent")
-async def get_recent_deployments(limit: int = Query(10, ge=1, le=50)):
+async def get_recent_deployments(request: Request, response: Response, limit: int = Query(10, ge=1, le=50)):
     """Get recent deployments"""
+    etag = _collection_etag("recent", limit)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    _set_etag(response, etag)
+    
     deployments = deployment_storage.get_all_deployments(limit)
     return DeploymentListResponse(
-        deployments=deployments,
+        deployments=[deployment_storage.with_build_logs(d) for d in deployments],
         total=len(deployments)
     )
 
+
+@router.get("/stats/extraction")
+async def get_extraction_statistics():
+    """Get counts of deployment prompts answered by the fast path, the LLM and the regex fallback"""
+    return get_extraction_stats()
+
+@router.get("/stats/redeploy")
+async def get_redeploy_statistics():
+    """Get counts of pushes that triggered a redeploy and pushes skipped as no-ops"""
+    return redeploy_filter.get_stats()
+
+@router.get("/stats/idempotency")
+async def get_idempotency_statistics():
+    """Get counts of deployment requests started and duplicates answered without new work"""
+    return {
+        "idempotency_keys": deploy_idempotency.get_stats(),
+        "in_flight": in_flight_deployments.get_stats()
+    }
@@ -3,6 +3,7 @@ import hashlib
 import json
 from fastapi import APIRouter, Request, Header, HTTPException
 from app.config import settings
+from app.utils.github import handle_hook_event
 
 router = APIRouter()
 
@@ -23,7 +24,8 @@ def verify_signature(payload: bytes, signature: str) -> bool:
 @router.post("/github")
 async def github_webhook(
     request: Request,
-    x_hub_signature_256: str = Header(None)
+    x_hub_signature_256: str = Header(None),
+    x_github_event: str = Header(None)
 ):
     try:
         body = await request.body()
@@ -41,6 +43,9 @@ async def github_webhook(
         if not repo_name:
             raise HTTPException(status_code=400, detail="Repository name not found in payload")
 
+        if handle_hook_event(x_github_event, payload):
+            return {"status": "ok", "repository": repo_name, "hook": "deleted"}
+
         print(f"✅ Webhook received from repo: {repo_name}")
         # TODO: Redeploy logic here
         return {"status": "ok", "repository": repo_name}
@@ -0,0 +1,116 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+from app.config import settings
+from app.services.build_plan import generate_build_plan
+
+# Directories that never hold a deployable app of their own
+SKIP_DIRS = {
+    "node_modules", "bower_components", "vendor", "venv", ".venv", "env", "site-packages",
+    "__pycache__", ".tox", ".mypy_cache", ".pytest_cache", "dist", "build", "out", "target",
+    "coverage", ".next", ".nuxt", ".cache", "docs", "test", "tests", "examples", "fixtures"
+}
+
+Detector = Callable[[str, Set[str]], Optional[str]]
+DETECTORS: List[Detector] = []
+
+def register_detector(detector: Detector) -> Detector:
+    """
+    Add an app detector. Detectors get a directory and the names of the files in it,
+    and return an app type or None. They are tried in registration order.
+    """
+    DETECTORS.append(detector)
+    return detector
+
+@register_detector
+def detect_node(path: str, files: Set[str]) -> Optional[str]:
+    if "package.json" not in files:
+        return None
+    with open(os.path.join(path, "package.json"), "r") as f:
+        package_data = json.load(f)
+    return "react" if "react" in package_data.get("dependencies", {}) else "nodejs"
+
+@register_detector
+def detect_python(path: str, files: Set[str]) -> Optional[str]:
+    if files & {"requirements.txt", "pyproject.toml", "Pipfile", "uv.lock"}:
+        return "python"
+    return None
+
+@register_detector
+def detect_docker(path: str, files: Set[str]) -> Optional[str]:
+    return "docker" if "Dockerfile" in files else None
+
+def _scan(path: str):
+    """List a directory's files and the subdirectories worth descending into"""
+    files, subdirs = set(), []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS and not entry.name.startswith("."):
+                        subdirs.append(entry.name)
+                else:
+                    files.add(entry.name)
+    except OSError:
+        pass
+    return files, sorted(subdirs)
+
+def _detect_directory(path: str):
+    """Run the detectors on one directory; returns (app type or None, subdirectories)"""
+    files, subdirs = _scan(path)
+    for detector in DETECTORS:
+        try:
+            app_type = detector(path, files)
+        except Exception as e:
+            print(f"⚠️ App detector {detector.__name__} failed on {path}: {str(e)}")
+            continue
+        if app_type:
+            return app_type, subdirs
+    return None, subdirs
+
+def detect_services(repo_path: str, max_depth: Optional[int] = None, max_dirs: Optional[int] = None, concurrency: Optional[int] = None) -> List[Dict]:
+    """
+    Find the deployable services in a repository: the root if it is an app,
+    otherwise every app directory down to max_depth (e.g. backend/ and frontend/ in a monorepo).
+    Each level is detected concurrently, app directories are not descended into,
+    and at most max_dirs directories are examined.
+    Returns dicts with root_dir ("" for the repository root), app_type and build_plan, ordered by path.
+    """
+    max_depth = settings.detect_max_depth if max_depth is None else max_depth
+    max_dirs = settings.detect_max_dirs if max_dirs is None else max_dirs
+    concurrency = settings.detect_concurrency if concurrency is None else concurrency
+
+    services = []
+    level = [""]
+    examined = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for depth in range(max_depth + 1):
+            level = level[:max(0, max_dirs - examined)]
+            if not level:
+                break
+            examined += len(level)
+
+            next_level = []
+            results = executor.map(lambda rel: _detect_directory(os.path.join(repo_path, rel)), level)
+            for rel, (app_type, subdirs) in zip(level, results):
+                if app_type:
+                    services.append({"root_dir": rel, "app_type": app_type})
+                else:
+                    next_level.extend(os.path.join(rel, name) for name in subdirs)
+
+            # A root-level app is the whole repository
+            if depth == 0 and services:
+                break
+            level = next_level
+
+    if not services:
+        services.append({"root_dir": "", "app_type": "static"})
+
+    services.sort(key=lambda service: service["root_dir"])
+    for service in services:
+        build_plan = generate_build_plan(os.path.join(repo_path, service["root_dir"]), service["app_type"])
+        if service["root_dir"]:
+            build_plan = {**(build_plan or {}), "root_dir": service["root_dir"]}
+        service["build_plan"] = build_plan
+    return services
@@ -0,0 +1,90 @@
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from app.models.deployment import BuildLog
+
+EPOCH = datetime(1970, 1, 1)
+
+# (level, step) pairs are interned process-wide and stored as small integer codes
+_interned_pairs: List[Tuple[str, str]] = []
+_pair_codes: Dict[Tuple[str, str], int] = {}
+
+def _intern(level: str, step: str) -> int:
+    key = (level, step)
+    code = _pair_codes.get(key)
+    if code is None:
+        code = len(_interned_pairs)
+        _pair_codes[key] = code
+        _interned_pairs.append(key)
+    return code
+
+def _to_micros(timestamp: datetime) -> int:
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+def _from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+class BuildLogBuffer:
+    """
+    Append-only build log storage for one deployment.
+    A line identical to the previous one (same level, step and message) is collapsed into
+    it, keeping a repeat count and first/last timestamps. Fields live in typed arrays and
+    messages in one UTF-8 buffer, so no per-line objects are kept.
+    """
+    
+    __slots__ = ("_codes", "_first", "_last", "_counts", "_offsets", "_text")
+    
+    def __init__(self):
+        self._codes = array('H')  # Interned (level, step) code per entry
+        self._first = array('q')  # Microseconds since epoch of the first occurrence
+        self._last = array('q')  # Microseconds since epoch of the last occurrence
+        self._counts = array('L')  # Consecutive occurrences collapsed into the entry
+        self._offsets = array('L', [0])  # Message i is _text[_offsets[i]:_offsets[i + 1]]
+        self._text = bytearray()
+    
+    def __len__(self) -> int:
+        return len(self._codes)
+    
+    def append(self, timestamp: datetime, level: str, step: str, message: str) -> Tuple[int, bool]:
+        """Add a line. Returns its entry position and whether a new entry was created."""
+        code = _intern(level, step)
+        encoded = message.encode()
+        micros = _to_micros(timestamp)
+        
+        if self._codes and self._codes[-1] == code and len(self._text) - self._offsets[-2] == len(encoded) and self._text.endswith(encoded):
+            self._counts[-1] += 1
+            self._last[-1] = micros
+            return len(self._codes) - 1, False
+        
+        self._codes.append(code)
+        self._first.append(micros)
+        self._last.append(micros)
+        self._counts.append(1)
+        self._text += encoded
+        self._offsets.append(len(self._text))
+        return len(self._codes) - 1, True
+    
+    def get(self, position: int) -> BuildLog:
+        """Materialize one entry as a BuildLog"""
+        level, step = _interned_pairs[self._codes[position]]
+        count = self._counts[position]
+        return BuildLog(
+            timestamp=_from_micros(self._first[position]),
+            level=level,
+            message=self._text[self._offsets[position]:self._offsets[position + 1]].decode(),
+            step=step,
+            count=count,
+            last_timestamp=_from_micros(self._last[position]) if count > 1 else None
+        )
+    
+    def to_list(self) -> List[BuildLog]:
+        return [self.get(position) for position in range(len(self._codes))]
+    
+    def total_lines(self) -> int:
+        """Number of lines appended, counting collapsed repeats"""
+        return sum(self._counts)
+    
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the buffer's arrays"""
+        arrays = (self._codes, self._first, self._last, self._counts, self._offsets)
+        return sum(a.itemsize * len(a) for a in arrays) + len(self._text)
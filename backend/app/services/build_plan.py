@@ -0,0 +1,196 @@
+import os
+import re
+import json
+from typing import Dict, List, Optional, Set
+
+# Files that usually define the web app, in the order they are checked
+PYTHON_ENTRYPOINT_CANDIDATES = [
+    "main.py", "app.py", "server.py", "asgi.py", "wsgi.py",
+    "app/main.py", "app/__init__.py", "src/main.py", "src/app.py", "api/main.py"
+]
+APP_ASSIGNMENT_PATTERN = re.compile(r'^(\w+)\s*(?::\s*\w+\s*)?=\s*(FastAPI|Starlette|Quart|Flask)\(', re.MULTILINE)
+ASGI_FRAMEWORKS = {"FastAPI", "Starlette", "Quart"}
+PYTHON_VERSION_PATTERN = re.compile(r'(\d+\.\d+(?:\.\d+)?)')
+# Package names as they appear in each dependency manifest
+REQUIREMENT_NAME_PATTERN = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)', re.MULTILINE)
+QUOTED_REQUIREMENT_PATTERN = re.compile(r'["\']([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(?:[<>=!~;@"\'])')
+TABLE_KEY_PATTERN = re.compile(r'^([A-Za-z0-9][A-Za-z0-9._-]*)\s*=', re.MULTILINE)
+LOCKED_NAME_PATTERN = re.compile(r'^name\s*=\s*"([^"]+)"', re.MULTILINE)
+
+def _read(repo_path: str, name: str) -> Optional[str]:
+    path = os.path.join(repo_path, name)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _exists(repo_path: str, name: str) -> bool:
+    return os.path.exists(os.path.join(repo_path, name))
+
+def _procfile_web_command(repo_path: str) -> Optional[str]:
+    """The web process from a Procfile, which always wins over detection"""
+    procfile = _read(repo_path, "Procfile")
+    if not procfile:
+        return None
+    for line in procfile.splitlines():
+        if line.startswith("web:"):
+            return line[len("web:"):].strip()
+    return None
+
+def _node_plan(repo_path: str) -> Dict:
+    """
+    Install from the lockfile with the package manager that wrote it,
+    preferring packages already in the build cache over the registry.
+    """
+    package_data = json.loads(_read(repo_path, "package.json") or "{}")
+    scripts = package_data.get("scripts", {})
+    env_vars: List[Dict] = []
+
+    if _exists(repo_path, "pnpm-lock.yaml"):
+        package_manager = "pnpm"
+        install = "corepack enable && pnpm install --frozen-lockfile --prefer-offline"
+    elif _exists(repo_path, "yarn.lock"):
+        package_manager = "yarn"
+        # Yarn 2+ projects carry a .yarnrc.yml and spell the flag differently
+        if _exists(repo_path, ".yarnrc.yml"):
+            install = "corepack enable && yarn install --immutable"
+        else:
+            install = "yarn install --frozen-lockfile --prefer-offline"
+    elif _exists(repo_path, "package-lock.json") or _exists(repo_path, "npm-shrinkwrap.json"):
+        package_manager = "npm"
+        install = "npm ci --prefer-offline --no-audit --no-fund"
+    else:
+        package_manager = "npm"
+        install = "npm install"
+
+    build_command = install
+    if "build" in scripts:
+        build_command += f" && {package_manager} run build"
+
+    if "start" in scripts:
+        start_command = f"{package_manager} start"
+    elif package_data.get("main"):
+        start_command = f"node {package_data['main']}"
+    else:
+        start_command = "npm start"
+
+    node_version = (_read(repo_path, ".nvmrc") or _read(repo_path, ".node-version") or "").strip().lstrip("v")
+    if not node_version:
+        node_version = package_data.get("engines", {}).get("node", "")
+    if node_version:
+        env_vars.append({"key": "NODE_VERSION", "value": node_version})
+
+    return {
+        "package_manager": package_manager,
+        "build_command": build_command,
+        "start_command": _procfile_web_command(repo_path) or start_command,
+        "env_vars": env_vars
+    }
+
+def _python_packages(repo_path: str) -> Set[str]:
+    """Normalized names of the packages the repository's manifests and lockfiles declare"""
+    names: List[str] = []
+    for line in (_read(repo_path, "requirements.txt") or "").splitlines():
+        if not line.lstrip().startswith(("-", "#")):
+            names += REQUIREMENT_NAME_PATTERN.findall(line)
+    # PEP 621 dependency strings, and Poetry/Pipfile tables keyed by package name
+    pyproject = _read(repo_path, "pyproject.toml") or ""
+    names += QUOTED_REQUIREMENT_PATTERN.findall(pyproject) + TABLE_KEY_PATTERN.findall(pyproject)
+    names += TABLE_KEY_PATTERN.findall(_read(repo_path, "Pipfile") or "")
+    for lockfile in ("uv.lock", "poetry.lock"):
+        names += LOCKED_NAME_PATTERN.findall(_read(repo_path, lockfile) or "")
+    try:
+        names += json.loads(_read(repo_path, "Pipfile.lock") or "{}").get("default", {}).keys()
+    except ValueError:
+        pass
+    return {name.lower().replace("_", "-") for name in names}
+
+def _python_entrypoint(repo_path: str, packages: Set[str]) -> Optional[str]:
+    """
+    Find the ASGI/WSGI app and build a command for it, only with a server the
+    repository installs (otherwise the caller falls back to running the script).
+    """
+    # Django projects expose <project>/wsgi.py next to manage.py
+    if _exists(repo_path, "manage.py") and "gunicorn" in packages:
+        for name in sorted(os.listdir(repo_path)):
+            if _exists(repo_path, os.path.join(name, "wsgi.py")):
+                return f"gunicorn {name}.wsgi:application --bind 0.0.0.0:$PORT"
+
+    for candidate in PYTHON_ENTRYPOINT_CANDIDATES:
+        source = _read(repo_path, candidate)
+        if not source:
+            continue
+        match = APP_ASSIGNMENT_PATTERN.search(source)
+        if not match:
+            continue
+
+        module = candidate[:-len(".py")].replace("/", ".").removesuffix(".__init__")
+        target = f"{module}:{match.group(1)}"
+        server = "uvicorn" if match.group(2) in ASGI_FRAMEWORKS else "gunicorn"
+        if server not in packages:
+            return None
+        if server == "uvicorn":
+            return f"uvicorn {target} --host 0.0.0.0 --port $PORT"
+        return f"gunicorn {target} --bind 0.0.0.0:$PORT"
+    return None
+
+def _python_plan(repo_path: str) -> Dict:
+    """Install from the lockfile with the tool that wrote it, without re-resolving"""
+    env_vars: List[Dict] = []
+    run_prefix = ""
+
+    if _exists(repo_path, "uv.lock"):
+        package_manager = "uv"
+        build_command = "pip install uv && uv sync --frozen --no-dev"
+        run_prefix = "uv run --frozen "
+    elif _exists(repo_path, "poetry.lock"):
+        package_manager = "poetry"
+        build_command = "pip install poetry && poetry config virtualenvs.create false && poetry install --no-root --only main --no-interaction"
+    elif _exists(repo_path, "Pipfile.lock"):
+        package_manager = "pipenv"
+        build_command = "pip install pipenv && pipenv install --deploy --system"
+    elif _exists(repo_path, "requirements.txt"):
+        package_manager = "pip"
+        build_command = "pip install --prefer-binary -r requirements.txt"
+    elif _exists(repo_path, "pyproject.toml"):
+        package_manager = "pip"
+        build_command = "pip install --prefer-binary ."
+    else:
+        package_manager = "pip"
+        build_command = ""
+
+    entrypoint = _python_entrypoint(repo_path, _python_packages(repo_path))
+    if entrypoint:
+        start_command = run_prefix + entrypoint
+    elif _exists(repo_path, "main.py") and not _exists(repo_path, "app.py"):
+        start_command = f"{run_prefix}python main.py"
+    else:
+        start_command = f"{run_prefix}python app.py"
+
+    version_file = _read(repo_path, ".python-version") or _read(repo_path, "runtime.txt") or ""
+    version = PYTHON_VERSION_PATTERN.search(version_file)
+    env_vars.append({"key": "PYTHON_VERSION", "value": version.group(1) if version else "3.9"})
+
+    return {
+        "package_manager": package_manager,
+        "build_command": build_command,
+        "start_command": _procfile_web_command(repo_path) or start_command,
+        "env_vars": env_vars
+    }
+
+def generate_build_plan(repo_path: str, app_type: str) -> Optional[Dict]:
+    """
+    Work out reproducible build and start commands from a repository's lockfiles and manifests.
+    Returns None for app types Render builds on its own (docker, static).
+    """
+    try:
+        if app_type in ("react", "nodejs"):
+            return _node_plan(repo_path)
+        if app_type == "python":
+            return _python_plan(repo_path)
+    except Exception as e:
+        print(f"⚠️ Could not generate build plan: {str(e)}")
+    return None
@@ -1,33 +1,218 @@
-import os
 import json
+import time
 import uuid
-from typing import Dict, Optional, List
-from openai import OpenAI
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict, Optional, List
+from app.config import settings
+from app.utils.openai_client import get_openai_client
+from app.utils.llm_limiter import llm_admission, LLMOverloadedError
+from app.utils.intent_matcher import extract_entities, detect_ai_questions
+from app.utils.github import validate_repo_url
 from app.models.deployment import ChatRequest, ChatResponse, ChatMessage, MessageType
 
-class ConversationManager:
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token) used for context budgeting"""
+    return max(1, len(text) // 4)
+
+class Conversation:
+    """Recent messages of one conversation, a running summary of older turns and collected deployment slots."""
+    
+    __slots__ = ("messages", "summary_lines", "slots", "chars", "last_access")
+    
     def __init__(self):
-        self.conversations = {}  # Store conversation history
+        self.messages: Deque[ChatMessage] = deque()
+        self.slots: Dict[str, Optional[str]] = {"repo_url": None, "environment": None, "deployment_type": None}
+        self.summary_lines: Deque[str] = deque()
+        self.chars = 0
+        self.last_access = time.monotonic()
+
+class ConversationManager:
+    """
+    Conversation store with LRU eviction, idle TTL and a memory cap.
+    Each conversation keeps recent turns up to a token budget; older turns are
+    folded into a short running summary so prompt size stays predictable.
+    """
+    
+    def __init__(self, max_conversations: int = 10000, ttl: float = 86400, max_total_chars: int = 50_000_000,
+                 context_token_budget: int = 1000, summary_token_budget: int = 200):
+        self.conversations: "OrderedDict[str, Conversation]" = OrderedDict()  # Least recently used first
+        self.max_conversations = max_conversations
+        self.ttl = ttl
+        self.max_total_chars = max_total_chars
+        self.context_token_budget = context_token_budget
+        self.summary_token_budget = summary_token_budget
+        self.total_chars = 0
+        self.evictions = 0
     
     def get_conversation(self, conversation_id: str) -> List[ChatMessage]:
-        return self.conversations.get(conversation_id, [])
+        conversation = self._touch(conversation_id)
+        return list(conversation.messages) if conversation else []
     
     def add_message(self, conversation_id: str, message: ChatMessage):
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
-        self.conversations[conversation_id].append(message)
+        conversation = self._touch(conversation_id)
+        if conversation is None:
+            conversation = Conversation()
+            self.conversations[conversation_id] = conversation
+        
+        if message.type == MessageType.user:
+            self._update_slots(conversation, message.content)
+        
+        conversation.messages.append(message)
+        conversation.chars += len(message.content)
+        self.total_chars += len(message.content)
+        
+        # Fold the oldest turns into the summary once recent turns exceed the budget
+        while len(conversation.messages) > 1 and conversation.chars // 4 > self.context_token_budget:
+            self._fold_into_summary(conversation, conversation.messages.popleft())
+        
+        self._evict()
     
     def get_conversation_context(self, conversation_id: str) -> str:
-        messages = self.get_conversation(conversation_id)
-        context = ""
-        for msg in messages[-5:]:  # Last 5 messages for context
+        conversation = self._touch(conversation_id)
+        if conversation is None:
+            return ""
+        
+        # Pack the newest turns that fit in the token budget
+        lines = []
+        remaining = self.context_token_budget
+        for msg in reversed(conversation.messages):
             role = "User" if msg.type == MessageType.user else "AI"
-            context += f"{role}: {msg.content}\n"
-        return context
+            line = f"{role}: {msg.content}"
+            tokens = estimate_tokens(line)
+            if tokens > remaining:
+                if not lines:
+                    lines.append(line[:remaining * 4])
+                break
+            lines.append(line)
+            remaining -= tokens
+        lines.reverse()
+        
+        if conversation.summary_lines:
+            lines.insert(0, "Summary of earlier conversation: " + " ".join(conversation.summary_lines))
+        return "\n".join(lines) + "\n" if lines else ""
+    
+    def get_slots(self, conversation_id: str) -> Optional[Dict[str, Optional[str]]]:
+        """Return the deployment slots collected so far, or None if the conversation is unknown"""
+        conversation = self._touch(conversation_id)
+        return dict(conversation.slots) if conversation else None
+    
+    def get_stats(self) -> Dict:
+        """Return store size and eviction counters"""
+        return {
+            "conversations": len(self.conversations),
+            "max_conversations": self.max_conversations,
+            "total_chars": self.total_chars,
+            "max_total_chars": self.max_total_chars,
+            "evictions": self.evictions
+        }
+    
+    def _touch(self, conversation_id: str) -> Optional[Conversation]:
+        """Return a live conversation and mark it most recently used"""
+        conversation = self.conversations.get(conversation_id)
+        if conversation is None:
+            return None
+        
+        now = time.monotonic()
+        if now - conversation.last_access > self.ttl:
+            self._remove(conversation_id)
+            return None
+        
+        conversation.last_access = now
+        self.conversations.move_to_end(conversation_id)
+        return conversation
+    
+    def _update_slots(self, conversation: Conversation, text: str):
+        """Fill deployment slots from a user message; later mentions replace earlier ones"""
+        entities = extract_entities(text)
+        
+        repo_urls = [url for url in entities.repo_urls if validate_repo_url(url)]
+        if repo_urls:
+            conversation.slots["repo_url"] = repo_urls[-1]
+        
+        environment = entities.unambiguous_environment
+        if environment is None and len(entities.environments) == 1:
+            environment = entities.environments[0]
+        if environment:
+            conversation.slots["environment"] = environment
+        
+        if entities.deployment_type:
+            conversation.slots["deployment_type"] = entities.deployment_type
+    
+    def _fold_into_summary(self, conversation: Conversation, message: ChatMessage):
+        """Move a message out of the recent turns into the bounded running summary"""
+        conversation.chars -= len(message.content)
+        self.total_chars -= len(message.content)
+        
+        role = "User" if message.type == MessageType.user else "AI"
+        text = " ".join(message.content.split())
+        conversation.summary_lines.append(f"{role}: {text[:120]}{'...' if len(text) > 120 else ''}")
+        while sum(estimate_tokens(line) for line in conversation.summary_lines) > self.summary_token_budget:
+            conversation.summary_lines.popleft()
+    
+    def _remove(self, conversation_id: str):
+        conversation = self.conversations.pop(conversation_id)
+        self.total_chars -= conversation.chars
+    
+    def _evict(self):
+        """Drop idle conversations, then least recently used ones beyond the size and memory caps"""
+        now = time.monotonic()
+        while self.conversations:
+            conversation_id, conversation = next(iter(self.conversations.items()))
+            expired = now - conversation.last_access > self.ttl
+            over_capacity = len(self.conversations) > self.max_conversations or self.total_chars > self.max_total_chars
+            if not expired and not (over_capacity and len(self.conversations) > 1):
+                break
+            self._remove(conversation_id)
+            self.evictions += 1
+
+conversation_manager = ConversationManager(
+    max_conversations=settings.chat_max_conversations,
+    ttl=settings.chat_conversation_ttl,
+    max_total_chars=settings.chat_max_total_chars,
+    context_token_budget=settings.chat_context_token_budget,
+    summary_token_budget=settings.chat_summary_token_budget
+)
+
+CHAT_SYSTEM_PROMPT = """
+        You are InfraAgent, a friendly and helpful AI assistant. You can help with general questions, coding, and infrastructure deployment.
+
+        Your capabilities:
+        1. Answer general questions and have casual conversations
+        2. Help with coding and technical questions
+        3. Help users deploy applications to different environments (dev, qa, beta, prod)
+        4. Provide helpful suggestions and examples
+        5. Be conversational, friendly, and engaging like ChatGPT
 
-conversation_manager = ConversationManager()
+        When users want to deploy something:
+        - If they don't provide a repository URL, ask for it naturally
+        - If they don't specify an environment, ask for it conversationally
+        - Provide helpful examples
+        - Be conversational and helpful
+
+        Available environments: dev, qa, beta, prod
+
+        IMPORTANT: Be conversational and friendly. Don't just ask for information - engage in natural conversation. If someone says "hi" or asks general questions, respond naturally like ChatGPT would.
+        """
+
+CHAT_ERROR_MESSAGE = "I'm having trouble processing your request right now. Please try again or contact support."
+CHAT_CONFIG_ERROR_MESSAGE = "Configuration error: OpenAI API key not found. Please contact support."
+
+def build_chat_messages(user_message: str, context: str) -> List[Dict]:
+    """
+    Build the OpenAI message list from the system prompt, conversation context and user message.
+    """
+    messages = [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT}
+    ]
+    
+    # Add conversation context if available
+    if context.strip():
+        messages.append({"role": "system", "content": f"Previous conversation:\n{context}"})
+    
+    messages.append({"role": "user", "content": user_message})
+    return messages
 
-def process_chat_message(request: ChatRequest) -> ChatResponse:
+async def process_chat_message(request: ChatRequest) -> ChatResponse:
     """
     Process a chat message and generate an AI response.
     """
@@ -45,7 +230,7 @@ def process_chat_message(request: ChatRequest) -> ChatResponse:
     context = conversation_manager.get_conversation_context(conversation_id)
     
     # Generate AI response
-    ai_response = generate_ai_response(request.message, context)
+    ai_response = await generate_ai_response(request.message, context)
     
     # Add AI message to conversation
     ai_message = ChatMessage(
@@ -59,63 +244,34 @@ def process_chat_message(request: ChatRequest) -> ChatResponse:
         conversation_id=conversation_id,
         needs_input=ai_response.get("needs_input", False),
         input_type=ai_response.get("input_type"),
-        suggestions=ai_response.get("suggestions")
+        suggestions=ai_response.get("suggestions"),
+        slots=conversation_manager.get_slots(conversation_id)
     )
 
-def generate_ai_response(user_message: str, context: str) -> Dict:
+async def generate_ai_response(user_message: str, context: str) -> Dict:
     """
     Generate an AI response using OpenAI.
     """
     try:
-        api_key = os.getenv('OPENAI_API_KEY')
+        client = get_openai_client()
         
-        if not api_key:
+        if client is None:
             print("OPENAI_API_KEY not found in environment variables")
             return {
-                "message": "Configuration error: OpenAI API key not found. Please contact support.",
+                "message": CHAT_CONFIG_ERROR_MESSAGE,
                 "needs_input": False
             }
         
-        client = OpenAI(api_key=api_key)
+        messages = build_chat_messages(user_message, context)
         
-        system_prompt = """
-        You are InfraAgent, a friendly and helpful AI assistant. You can help with general questions, coding, and infrastructure deployment.
-
-        Your capabilities:
-        1. Answer general questions and have casual conversations
-        2. Help with coding and technical questions
-        3. Help users deploy applications to different environments (dev, qa, beta, prod)
-        4. Provide helpful suggestions and examples
-        5. Be conversational, friendly, and engaging like ChatGPT
-
-        When users want to deploy something:
-        - If they don't provide a repository URL, ask for it naturally
-        - If they don't specify an environment, ask for it conversationally
-        - Provide helpful examples
-        - Be conversational and helpful
-
-        Available environments: dev, qa, beta, prod
-
-        IMPORTANT: Be conversational and friendly. Don't just ask for information - engage in natural conversation. If someone says "hi" or asks general questions, respond naturally like ChatGPT would.
-        """
-        
-        # Create the conversation context
-        messages = [
-            {"role": "system", "content": system_prompt}
-        ]
-        
-        # Add conversation context if available
-        if context.strip():
-            messages.append({"role": "system", "content": f"Previous conversation:\n{context}"})
-        
-        messages.append({"role": "user", "content": user_message})
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=500
-        )
+        async with llm_admission.admit():
+            response = await client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=500,
+                timeout=settings.openai_chat_timeout
+            )
         
         ai_message = response.choices[0].message.content.strip()
         
@@ -129,29 +285,109 @@ def generate_ai_response(user_message: str, context: str) -> Dict:
             "suggestions": needs_info["suggestions"]
         }
         
+    except LLMOverloadedError:
+        raise
     except Exception as e:
         print(f"Error in AI response generation: {str(e)}")
         return {
-            "message": "I'm having trouble processing your request right now. Please try again or contact support.",
+            "message": CHAT_ERROR_MESSAGE,
             "needs_input": False
         }
 
+async def stream_chat_message(request: ChatRequest) -> AsyncIterator[Dict]:
+    """
+    Process a chat message and stream the AI response as it is generated.
+    The caller must already hold an LLM admission slot.
+    Yields a "start" event with the conversation ID, one "token" event per chunk from the
+    model, and a final "done" event carrying the same fields as ChatResponse.
+    """
+    conversation_id = request.conversation_id or str(uuid.uuid4())
+    
+    conversation_manager.add_message(conversation_id, ChatMessage(
+        type=MessageType.user,
+        content=request.message
+    ))
+    context = conversation_manager.get_conversation_context(conversation_id)
+    
+    yield {"event": "start", "data": {"conversation_id": conversation_id}}
+    
+    chunks = []
+    failed = False
+    try:
+        async for token in stream_ai_response(request.message, context):
+            chunks.append(token)
+            yield {"event": "token", "data": {"content": token}}
+    except Exception as e:
+        print(f"Error in AI response streaming: {str(e)}")
+        failed = True
+        error_message = CHAT_CONFIG_ERROR_MESSAGE if get_openai_client() is None else CHAT_ERROR_MESSAGE
+        token = f"\n\n{error_message}" if chunks else error_message
+        chunks.append(token)
+        yield {"event": "token", "data": {"content": token}}
+    
+    ai_message = "".join(chunks).strip()
+    conversation_manager.add_message(conversation_id, ChatMessage(
+        type=MessageType.ai,
+        content=ai_message
+    ))
+    
+    # Only analyze for deployment-specific needs, not general chat
+    if failed:
+        needs_info = {"needs_input": False, "input_type": None, "suggestions": None}
+    else:
+        needs_info = analyze_needs_information(request.message, ai_message)
+    
+    yield {
+        "event": "done",
+        "data": {
+            "message": ai_message,
+            "conversation_id": conversation_id,
+            "needs_input": needs_info["needs_input"],
+            "input_type": needs_info["input_type"],
+            "suggestions": needs_info["suggestions"],
+            "slots": conversation_manager.get_slots(conversation_id)
+        }
+    }
+
+async def stream_ai_response(user_message: str, context: str) -> AsyncIterator[str]:
+    """
+    Stream AI response text from OpenAI chunk by chunk.
+    The caller must already hold an LLM admission slot.
+    """
+    client = get_openai_client()
+    if client is None:
+        raise Exception("OPENAI_API_KEY not found in environment variables")
+    
+    stream = await client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=build_chat_messages(user_message, context),
+        temperature=0.7,
+        max_tokens=500,
+        timeout=settings.openai_chat_timeout,
+        stream=True
+    )
+    
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
 def analyze_needs_information(user_message: str, ai_response: str) -> Dict:
     """
     Analyze if the AI response indicates we need more information from the user.
     Only trigger for explicit deployment requests.
     """
-    user_lower = user_message.lower()
-    ai_lower = ai_response.lower()
+    entities = extract_entities(user_message)
     
     needs_input = False
     input_type = None
     suggestions = []
     
     # Only analyze if user explicitly mentions deployment
-    if any(phrase in user_lower for phrase in ["deploy", "deployment", "deploy my"]):
+    if entities.deploy_intent:
+        questions = detect_ai_questions(ai_response)
+        
         # Check if AI is asking for repository URL
-        if any(phrase in ai_lower for phrase in ["repository", "github", "repo", "url"]):
+        if questions["asks_repo_url"]:
             needs_input = True
             input_type = "repo_url"
             suggestions = [
@@ -160,13 +396,13 @@ def analyze_needs_information(user_message: str, ai_response: str) -> Dict:
             ]
         
         # Check if AI is asking for environment
-        elif any(phrase in ai_lower for phrase in ["environment", "where", "which environment"]):
+        elif questions["asks_environment"]:
             needs_input = True
             input_type = "environment"
             suggestions = ["dev", "qa", "beta", "prod"]
         
         # Check if repository URL is missing
-        elif "github.com" not in user_lower:
+        elif not entities.mentions_github:
             needs_input = True
             input_type = "repo_url"
             suggestions = [
@@ -175,7 +411,7 @@ def analyze_needs_information(user_message: str, ai_response: str) -> Dict:
             ]
         
         # Check if environment is missing
-        elif not any(env in user_lower for env in ["dev", "qa", "beta", "prod", "production", "staging"]):
+        elif not entities.environments:
             needs_input = True
             input_type = "environment"
             suggestions = ["dev", "qa", "beta", "prod"]
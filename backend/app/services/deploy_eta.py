@@ -0,0 +1,135 @@
+import os
+import json
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+
+DurationKey = Tuple[str, str, str]  # (repo_url, app_type, environment)
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+class DeployDurationTracker:
+    """
+    Learns how long provider deployments take to go live and turns that into
+    a polling schedule: sparse early, dense around the expected completion time,
+    backing off exponentially once it has passed.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 2.0,
+        max_interval: float = 30.0,
+        default_timeout: float = 900.0,
+        min_timeout: float = 120.0,
+        max_timeout: float = 3600.0,
+        max_samples: int = 50,
+        path: Optional[str] = None
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_samples = max_samples
+        self.path = path
+        self._samples: Dict[str, deque] = {}  # Scope key -> recent durations in seconds
+        self._lock = threading.Lock()
+        self._load()
+
+    def _scopes(self, key: DurationKey) -> List[str]:
+        """Scopes from most to least specific: repository, app type in the environment, everything"""
+        repo_url, app_type, environment = key
+        return [f"{repo_url}|{app_type}|{environment}", f"*|{app_type}|{environment}", "*"]
+
+    def _history(self, key: DurationKey) -> List[float]:
+        """Durations from the most specific scope with enough history"""
+        with self._lock:
+            for scope in self._scopes(key):
+                samples = self._samples.get(scope)
+                if samples and len(samples) >= 3:
+                    return list(samples)
+        return []
+
+    def record(self, key: DurationKey, seconds: float):
+        """Record how long a deployment took to go live"""
+        with self._lock:
+            for scope in self._scopes(key):
+                self._samples.setdefault(scope, deque(maxlen=self.max_samples)).append(round(seconds, 1))
+            self._save()
+
+    def estimate(self, key: DurationKey) -> Optional[Dict[str, float]]:
+        """Expected (median) and slow (p90, p95) durations, or None without history"""
+        samples = self._history(key)
+        if not samples:
+            return None
+        return {
+            "median": _percentile(samples, 0.5),
+            "p90": _percentile(samples, 0.9),
+            "p95": _percentile(samples, 0.95),
+            "samples": len(samples)
+        }
+
+    def timeout_for(self, key: DurationKey) -> float:
+        """Give up after twice the 95th percentile duration, within the configured bounds"""
+        estimate = self.estimate(key)
+        if estimate is None:
+            return self.default_timeout
+        return min(self.max_timeout, max(self.min_timeout, 2 * estimate["p95"]))
+
+    def next_interval(self, elapsed: float, estimate: Optional[Dict[str, float]]) -> float:
+        """Seconds to wait before the next status check"""
+        if estimate is None:
+            # No history: grow the interval with elapsed time
+            interval = elapsed / 4
+        elif elapsed < estimate["median"]:
+            # Halve the remaining time, so checks are sparse early and cluster just before
+            # the expected finish (not capped by max_interval, nothing is expected yet)
+            return max(self.min_interval, (estimate["median"] - elapsed) / 2)
+        else:
+            # Past it: back off exponentially, each wait growing with the time spent past the median
+            interval = (elapsed - estimate["median"]) / 5
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _load(self):
+        """Load recorded durations from the persistence file"""
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            for scope, samples in data.get("samples", {}).items():
+                self._samples[scope] = deque(samples[-self.max_samples:], maxlen=self.max_samples)
+            print(f"📦 Loaded deployment durations for {len(self._samples)} scopes from {self.path}")
+        except Exception as e:
+            print(f"⚠️ Could not load deployment durations: {str(e)}")
+
+    def _save(self):
+        """Write recorded durations to the persistence file atomically (caller holds the lock)"""
+        if not self.path:
+            return
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"samples": {scope: list(samples) for scope, samples in self._samples.items()}}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ Could not persist deployment durations: {str(e)}")
+
+# Global instance
+deploy_duration_tracker = DeployDurationTracker(
+    min_interval=settings.deploy_poll_min_interval,
+    max_interval=settings.deploy_poll_max_interval,
+    default_timeout=settings.deploy_timeout_default,
+    min_timeout=settings.deploy_timeout_min,
+    max_timeout=settings.deploy_timeout_max,
+    path=settings.deploy_history_path
+)
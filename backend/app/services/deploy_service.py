@@ -1,72 +1,141 @@
 import os
+import json
 import subprocess
 import asyncio
-from app.models.deployment import DeploymentRequest, DeploymentResponse, DeploymentStatus
+from typing import Dict, List, Tuple
+from app.models.deployment import DeploymentRequest, DeploymentResponse, DeploymentStatus, BatchDeploymentRequest, BatchDeploymentResponse, BatchTarget, RollbackRequest, PromotionRequest, Environment
 from app.utils.github import validate_repo_url, setup_webhook
 from app.services.deployment_storage import deployment_storage
 from app.utils.ai_prompt import extract_deployment_info
 from app.services.render_deployment import render_deployment_service
+from app.services.redeploy_filter import redeploy_filter
+from app.services.chat_service import conversation_manager
+from app.utils.idempotency import in_flight_deployments, IdempotencyConflictError
 
 async def create_deployment(request: DeploymentRequest) -> DeploymentResponse:
     """
     Create a deployment using AI to extract all necessary information from the user's prompt.
     """
+    # Step 1: Use AI to extract deployment information
+    print(f"🤖 Analyzing deployment request: {request.prompt}")
+    extracted_info = await extract_deployment_info(request.prompt)
+    print(f"📋 AI extracted info: {extracted_info}")
+    
+    return await launch_deployment(request.prompt, extracted_info)
+
+async def create_deployment_from_conversation(conversation_id: str) -> DeploymentResponse:
+    """
+    Create a deployment from the slots a chat conversation has already collected,
+    without sending the conversation back through AI extraction.
+    """
+    slots = conversation_manager.get_slots(conversation_id)
+    if slots is None:
+        raise ValueError(f"Conversation not found: {conversation_id}")
+    
+    repo_url = slots.get('repo_url')
+    environment = slots.get('environment')
+    extracted_info = {
+        'repo_url': repo_url,
+        'environment': environment,
+        'deployment_type': slots.get('deployment_type') or 'web application',
+        'description': f"Deployment requested in chat conversation {conversation_id}",
+        'requirements': None,
+        'needs_repo_url': repo_url is None,
+        'needs_environment': environment is None
+    }
+    print(f"💬 Deploying from conversation {conversation_id}: {extracted_info}")
+    
+    prompt = f"Deploy {repo_url} to {environment} (chat conversation {conversation_id})"
+    return await launch_deployment(prompt, extracted_info)
+
+class DeploymentConflictError(IdempotencyConflictError):
+    """A different deployment of the same repository and environment is already in progress."""
+
+def _in_flight_key(repo_url: str, environment: str, extracted_info: dict) -> Tuple[str, str]:
+    """
+    Key and fingerprint for sharing in-flight deployments: the target identifies the deployment,
+    the rest of the request must match for a second request to join it.
+    """
+    key = f"{str(repo_url).rstrip('/').lower()}|{environment}"
+    fingerprint = json.dumps({
+        'deployment_type': extracted_info.get('deployment_type') or 'web application',
+        'requirements': extracted_info.get('requirements')
+    }, sort_keys=True, default=str)
+    return key, fingerprint
+
+async def launch_deployment(prompt: str, extracted_info: dict) -> DeploymentResponse:
+    """
+    Validate extracted deployment information and start the deployment.
+    """
+    repo_url = extracted_info.get('repo_url')
+    environment = extracted_info.get('environment')
+    needs_repo_url = extracted_info.get('needs_repo_url', False)
+    needs_environment = extracted_info.get('needs_environment', False)
+    
+    # Step 2: Check if repository URL is needed
+    if needs_repo_url or not repo_url:
+        return DeploymentResponse(
+            deployment_id="",
+            status="needs_repo_url",
+            message="Please provide a GitHub repository URL. For example: 'Deploy my app from https://github.com/username/repo to dev'",
+            extracted_info=extracted_info
+        )
+    
+    # Step 3: Check if environment is needed
+    if needs_environment or not environment:
+        return DeploymentResponse(
+            deployment_id="",
+            status="needs_environment",
+            message="Please specify the target environment. For example: 'Deploy my app from https://github.com/username/repo to dev'",
+            extracted_info=extracted_info
+        )
+    
+    # Step 4: Validate extracted information
+    if not validate_repo_url(repo_url):
+        raise ValueError(f"Invalid GitHub repository URL: {repo_url}")
+    
+    # Identical requests already in flight share one deployment instead of each starting a build;
+    # a different request for the same target is rejected rather than merged into it
+    key, fingerprint = _in_flight_key(repo_url, environment, extracted_info)
+    try:
+        response, shared = await in_flight_deployments.run(
+            key, fingerprint, lambda: _start_deployment(prompt, extracted_info)
+        )
+    except IdempotencyConflictError:
+        raise DeploymentConflictError(
+            f"A deployment of {repo_url} to {environment} with different settings is already in progress"
+        )
+    if shared:
+        print(f"♻️ Joined deployment {response.deployment_id} already in flight for {repo_url} to {environment}")
+    return response
+
+async def _start_deployment(prompt: str, extracted_info: dict) -> DeploymentResponse:
+    """
+    Create the deployment record and deploy it.
+    """
     try:
-        # Step 1: Use AI to extract deployment information
-        print(f"🤖 Analyzing deployment request: {request.prompt}")
-        extracted_info = extract_deployment_info(request.prompt)
-        
         repo_url = extracted_info.get('repo_url')
         environment = extracted_info.get('environment')
         deployment_type = extracted_info.get('deployment_type', 'web application')
         requirements = extracted_info.get('requirements')
-        needs_repo_url = extracted_info.get('needs_repo_url', False)
-        needs_environment = extracted_info.get('needs_environment', False)
-        
-        print(f"📋 AI extracted info: {extracted_info}")
-        
-        # Step 2: Check if repository URL is needed
-        if needs_repo_url or not repo_url:
-            return DeploymentResponse(
-                deployment_id="",
-                status="needs_repo_url",
-                message="Please provide a GitHub repository URL. For example: 'Deploy my app from https://github.com/username/repo to dev'",
-                extracted_info=extracted_info
-            )
-        
-        # Step 3: Check if environment is needed
-        if needs_environment or not environment:
-            return DeploymentResponse(
-                deployment_id="",
-                status="needs_environment",
-                message="Please specify the target environment. For example: 'Deploy my app from https://github.com/username/repo to dev'",
-                extracted_info=extracted_info
-            )
-        
-        # Step 4: Validate extracted information
-        if not validate_repo_url(repo_url):
-            raise ValueError(f"Invalid GitHub repository URL: {repo_url}")
         
         # Step 5: Create deployment record
         deployment_id = deployment_storage.create_deployment(
             repo_url=repo_url,
             environment=environment,
-            prompt=request.prompt,
+            prompt=prompt,
             deployment_dir=f"/tmp/deployments/{environment}"
         )
         
         # Update with AI-extracted details
-        deployment = deployment_storage.get_deployment(deployment_id)
-        if deployment:
-            deployment.deployment_type = deployment_type
-            deployment.requirements = requirements
+        deployment_storage.update_deployment_details(deployment_id, deployment_type, requirements)
         
         # Step 6: Update status to in_progress
         deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.in_progress)
         
         # Step 7: Register webhook with GitHub for future deployments
         if repo_url:
-            setup_webhook(repo_url)
+            await asyncio.to_thread(setup_webhook, repo_url)
         
         # Step 8: Deploy to Render
         deployment_url = await render_deployment_service.deploy_to_render(
@@ -77,6 +146,7 @@ async def create_deployment(request: DeploymentRequest) -> DeploymentResponse:
         
         # Update deployment record with URL
         deployment_storage.update_deployment_url(deployment_id, deployment_url)
+        deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.completed)
         
         return DeploymentResponse(
             deployment_id=deployment_id,
@@ -92,6 +162,280 @@ async def create_deployment(request: DeploymentRequest) -> DeploymentResponse:
         
         raise e
 
+async def create_batch_deployment(request: BatchDeploymentRequest) -> BatchDeploymentResponse:
+    """
+    Deploy several (repository, environment) targets at once.
+    The prompt is extracted once, each repository is cloned and analyzed once,
+    and all targets are deployed in parallel.
+    """
+    extracted_info = {}
+    if request.prompt:
+        print(f"🤖 Analyzing batch deployment request: {request.prompt}")
+        extracted_info = await extract_deployment_info(request.prompt)
+    
+    # Group targets by repository so each one is cloned only once
+    responses: List[DeploymentResponse] = [None] * len(request.targets)
+    targets_by_repo: Dict[str, List[int]] = {}
+    for index, target in enumerate(request.targets):
+        repo_url = target.repo_url or extracted_info.get('repo_url')
+        if not repo_url or not validate_repo_url(repo_url):
+            responses[index] = DeploymentResponse(
+                deployment_id="",
+                status="failed",
+                message=f"Invalid or missing GitHub repository URL for {target.environment}: {repo_url}",
+                extracted_info={'repo_url': repo_url, 'environment': target.environment}
+            )
+            continue
+        targets_by_repo.setdefault(repo_url, []).append(index)
+    
+    prompt = request.prompt or "Batch deployment"
+    repo_results = await asyncio.gather(*[
+        _deploy_repository_targets(repo_url, [request.targets[i] for i in indexes], prompt, extracted_info)
+        for repo_url, indexes in targets_by_repo.items()
+    ])
+    for indexes, results in zip(targets_by_repo.values(), repo_results):
+        for index, result in zip(indexes, results):
+            responses[index] = result
+    
+    return BatchDeploymentResponse(deployments=responses, extracted_info=extracted_info)
+
+async def _deploy_repository_targets(repo_url: str, targets: List[BatchTarget], prompt: str, extracted_info: dict) -> List[DeploymentResponse]:
+    """
+    Deploy one repository to each target environment. Targets already being deployed
+    (by a single deploy or another batch) join that deployment instead of building again.
+    """
+    responses: List[DeploymentResponse] = [None] * len(targets)
+    keys = [_in_flight_key(repo_url, target.environment, extracted_info) for target in targets]
+    joined: Dict[int, asyncio.Future] = {}
+    started: List[int] = []
+    for index, (target, (key, fingerprint)) in enumerate(zip(targets, keys)):
+        try:
+            existing = in_flight_deployments.join(key, fingerprint)
+        except IdempotencyConflictError:
+            responses[index] = DeploymentResponse(
+                deployment_id="",
+                status="failed",
+                message=f"A deployment of {repo_url} to {target.environment} with different settings is already in progress",
+                extracted_info={'repo_url': repo_url, 'environment': target.environment}
+            )
+            continue
+        if existing is not None:
+            joined[index] = existing
+        else:
+            in_flight_deployments.begin(key, fingerprint)
+            started.append(index)
+    
+    try:
+        results = await _start_repository_targets(repo_url, [targets[i] for i in started], prompt, extracted_info) if started else []
+    except BaseException as e:
+        for index in started:
+            in_flight_deployments.finish(keys[index][0], error=e)
+        raise
+    for index, result in zip(started, results):
+        in_flight_deployments.finish(keys[index][0], result)
+        responses[index] = result
+    
+    for index, future in joined.items():
+        try:
+            responses[index] = await asyncio.shield(future)
+            print(f"♻️ Batch target {targets[index].environment} joined deployment {responses[index].deployment_id} already in flight")
+        except Exception as e:
+            responses[index] = DeploymentResponse(
+                deployment_id="", status="failed", message=str(e),
+                extracted_info={'repo_url': repo_url, 'environment': targets[index].environment}
+            )
+    return responses
+
+async def _start_repository_targets(repo_url: str, targets: List[BatchTarget], prompt: str, extracted_info: dict) -> List[DeploymentResponse]:
+    """Clone and analyze one repository, then deploy it to each target environment in parallel."""
+    deployment_ids = []
+    for target in targets:
+        deployment_id = deployment_storage.create_deployment(
+            repo_url=repo_url,
+            environment=target.environment,
+            prompt=prompt,
+            deployment_dir=f"/tmp/deployments/{target.environment}"
+        )
+        deployment_storage.update_deployment_details(
+            deployment_id,
+            extracted_info.get('deployment_type', 'web application'),
+            extracted_info.get('requirements')
+        )
+        deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.in_progress)
+        deployment_storage.add_build_log(deployment_id, "info", f"🚀 Starting Render deployment for {repo_url} to {target.environment}", "initialization")
+        deployment_ids.append(deployment_id)
+    
+    await asyncio.to_thread(setup_webhook, repo_url)
+    
+    try:
+        app_type = await render_deployment_service.prepare_repository(repo_url, deployment_ids)
+    except Exception as e:
+        for deployment_id in deployment_ids:
+            deployment_storage.add_build_log(deployment_id, "error", f"❌ Render deployment failed: {str(e)}", "failed")
+            deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.failed, str(e))
+        return [
+            DeploymentResponse(deployment_id=deployment_id, status="failed", message=str(e), extracted_info={'repo_url': repo_url, 'environment': target.environment})
+            for deployment_id, target in zip(deployment_ids, targets)
+        ]
+    
+    results = await asyncio.gather(*[
+        render_deployment_service.deploy_prepared(repo_url, target.environment, deployment_id, app_type)
+        for deployment_id, target in zip(deployment_ids, targets)
+    ], return_exceptions=True)
+    
+    responses = []
+    for deployment_id, target, result in zip(deployment_ids, targets, results):
+        target_info = {'repo_url': repo_url, 'environment': target.environment, 'app_type': app_type}
+        if isinstance(result, Exception):
+            deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.failed, str(result))
+            responses.append(DeploymentResponse(deployment_id=deployment_id, status="failed", message=str(result), extracted_info=target_info))
+        else:
+            deployment_storage.update_deployment_url(deployment_id, result)
+            deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.completed)
+            responses.append(DeploymentResponse(
+                deployment_id=deployment_id,
+                status="success",
+                message=f"Deployment initiated successfully for {repo_url} to {target.environment} environment",
+                extracted_info=target_info
+            ))
+    return responses
+
+async def rollback_deployment(request: RollbackRequest) -> DeploymentResponse:
+    """
+    Restore the build that was live on a deployment's Render service before it,
+    without cloning or rebuilding. The rollback is recorded as a new deployment.
+    """
+    deployment = deployment_storage.get_deployment(request.deployment_id)
+    if not deployment:
+        raise LookupError(f"Deployment not found: {request.deployment_id}")
+    if not deployment.render_service_id:
+        raise ValueError("Deployment has no Render service to roll back")
+    
+    service_id = deployment.render_service_id
+    
+    # Prefer a build we recorded ourselves, otherwise ask Render for the service's history
+    previous = deployment_storage.get_last_successful_deployment(service_id, before=deployment.created_at, exclude_id=deployment.id)
+    if previous:
+        target_deploy_id = previous.render_deploy_id
+    else:
+        target_deploy_id = await render_deployment_service.find_previous_deploy(service_id)
+    if not target_deploy_id:
+        raise ValueError("No previous successful deploy found for this service")
+    
+    reason = f": {request.reason}" if request.reason else ""
+    rollback_id = deployment_storage.create_deployment(
+        repo_url=deployment.repo_url,
+        environment=deployment.environment,
+        prompt=f"Rollback of deployment {deployment.id}{reason}",
+        deployment_dir=deployment.deployment_dir
+    )
+    deployment_storage.update_deployment_details(rollback_id, deployment.deployment_type, deployment.requirements)
+    deployment_storage.update_render_service_id(rollback_id, service_id)
+    deployment_storage.mark_rollback(rollback_id, deployment.id)
+    deployment_storage.update_deployment_status(rollback_id, DeploymentStatus.in_progress)
+    deployment_storage.add_build_log(deployment.id, "warning", f"⏪ Rolled back by deployment {rollback_id}{reason}", "rollback")
+    print(f"⏪ Rolling back {deployment.id} to Render deploy {target_deploy_id}")
+    
+    rollback_info = {
+        'repo_url': deployment.repo_url,
+        'environment': deployment.environment,
+        'rolled_back_deployment_id': deployment.id,
+        'restored_deployment_id': previous.id if previous else None,
+        'restored_render_deploy_id': target_deploy_id
+    }
+    try:
+        deployment_url = await render_deployment_service.rollback_service(
+            service_id, target_deploy_id, rollback_id, deployment.repo_url, deployment.environment
+        )
+    except Exception as e:
+        deployment_storage.add_build_log(rollback_id, "error", f"❌ Rollback failed: {str(e)}", "failed")
+        deployment_storage.update_deployment_status(rollback_id, DeploymentStatus.failed, str(e))
+        raise e
+    
+    deployment_storage.update_deployment_url(rollback_id, deployment_url)
+    deployment_storage.update_deployment_status(rollback_id, DeploymentStatus.completed)
+    return DeploymentResponse(
+        deployment_id=rollback_id,
+        status="success",
+        message=f"Rolled back {deployment.environment} to the previous successful deploy",
+        extracted_info=rollback_info
+    )
+
+async def promote_deployment(request: PromotionRequest) -> DeploymentResponse:
+    """
+    Promote the commit of a successful deployment to another environment,
+    reusing its detected app type instead of cloning and analyzing the repository again.
+    The promotion is recorded as a new deployment.
+    """
+    source = deployment_storage.get_deployment(request.deployment_id)
+    if not source:
+        raise LookupError(f"Deployment not found: {request.deployment_id}")
+    if source.status != DeploymentStatus.completed or not source.commit_sha or not source.app_type:
+        raise ValueError("Only completed deployments with a known commit can be promoted")
+    
+    environments = [e.value for e in Environment]
+    target_environment = request.target_environment
+    if not target_environment:
+        position = environments.index(source.environment) if source.environment in environments else len(environments) - 1
+        if position == len(environments) - 1:
+            raise ValueError(f"There is no environment after {source.environment} to promote to")
+        target_environment = environments[position + 1]
+    elif target_environment not in environments:
+        raise ValueError(f"Unknown environment: {target_environment}")
+    if target_environment == source.environment:
+        raise ValueError("Target environment must differ from the deployment's environment")
+    
+    promotion_info = {
+        'repo_url': source.repo_url,
+        'environment': target_environment,
+        'promoted_from_deployment_id': source.id,
+        'commit_sha': source.commit_sha,
+        'app_type': source.app_type
+    }
+    
+    # Nothing to do if the target environment already runs this commit
+    current = deployment_storage.get_environment_service(source.repo_url, target_environment)
+    service_id = current.render_service_id if current else None
+    if current and redeploy_filter.deployed_shas.get(service_id) == source.commit_sha:
+        return DeploymentResponse(
+            deployment_id=current.id,
+            status="unchanged",
+            message=f"{target_environment} is already running commit {source.commit_sha[:7]}",
+            extracted_info=promotion_info
+        )
+    
+    deployment_id = deployment_storage.create_deployment(
+        repo_url=source.repo_url,
+        environment=target_environment,
+        prompt=f"Promote deployment {source.id} from {source.environment} to {target_environment}",
+        deployment_dir=f"/tmp/deployments/{target_environment}"
+    )
+    deployment_storage.update_deployment_details(deployment_id, source.deployment_type, source.requirements)
+    deployment_storage.update_app_type(deployment_id, source.app_type)
+    deployment_storage.update_build_plan(deployment_id, source.build_plan)
+    deployment_storage.mark_promotion(deployment_id, source.id)
+    deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.in_progress)
+    deployment_storage.add_build_log(deployment_id, "info", f"⬆️ Promoting commit {source.commit_sha[:7]} from {source.environment} to {target_environment}", "initialization")
+    print(f"⬆️ Promoting {source.id} ({source.commit_sha[:7]}) to {target_environment}")
+    
+    try:
+        deployment_url = await render_deployment_service.promote(
+            source.repo_url, target_environment, deployment_id, source.app_type, source.commit_sha,
+            service_id=service_id, build_plan=source.build_plan
+        )
+    except Exception as e:
+        deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.failed, str(e))
+        raise e
+    
+    deployment_storage.update_deployment_url(deployment_id, deployment_url)
+    deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.completed)
+    return DeploymentResponse(
+        deployment_id=deployment_id,
+        status="success",
+        message=f"Promoted {source.repo_url} from {source.environment} to {target_environment}",
+        extracted_info=promotion_info
+    )
+
 async def simulate_deployment(deployment_id: str, repo_url: str, environment: str, deployment_type: str):
     """
     Simulate the deployment process with status updates.
@@ -2,10 +2,26 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 from app.models.deployment import DeploymentRecord, DeploymentStatus, BuildLog
+from app.services.log_index import BuildLogIndex
+from app.services.build_log_buffer import BuildLogBuffer
 
 class DeploymentStorage:
     def __init__(self):
         self.deployments: Dict[str, DeploymentRecord] = {}
+        self.build_logs: Dict[str, BuildLogBuffer] = {}  # Kept outside the records; see get_build_logs
+        self.versions: Dict[str, int] = {}  # Bumped on every change to a deployment
+        self.collection_version = 0  # Bumped on every change to any deployment
+        self.epoch = uuid.uuid4().hex[:8]  # Distinguishes versions from before a restart
+        self.log_index = BuildLogIndex()
+    
+    def _bump_version(self, deployment_id: str):
+        """Record that a deployment (and therefore the collection) changed"""
+        self.versions[deployment_id] = self.versions.get(deployment_id, 0) + 1
+        self.collection_version += 1
+    
+    def get_version(self, deployment_id: str) -> Optional[int]:
+        """Get the change counter of a deployment, or None if it doesn't exist"""
+        return self.versions.get(deployment_id)
     
     def create_deployment(self, repo_url: str, environment: str, prompt: str, deployment_dir: str = None) -> str:
         """Create a new deployment record"""
@@ -25,6 +41,8 @@ class DeploymentStorage:
         )
         
         self.deployments[deployment_id] = deployment
+        self.build_logs[deployment_id] = BuildLogBuffer()
+        self._bump_version(deployment_id)
         return deployment_id
     
     def update_deployment_status(self, deployment_id: str, status: DeploymentStatus, error_message: str = None):
@@ -39,6 +57,8 @@ class DeploymentStorage:
             
             if error_message:
                 deployment.error_message = error_message
+            
+            self._bump_version(deployment_id)
     
     def update_deployment_url(self, deployment_id: str, deployment_url: str):
         """Update deployment URL"""
@@ -46,19 +66,27 @@ class DeploymentStorage:
             deployment = self.deployments[deployment_id]
             deployment.deployment_url = deployment_url
             deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
     
     def add_build_log(self, deployment_id: str, level: str, message: str, step: str):
-        """Add a build log entry"""
+        """Add a build log entry, collapsing it into the previous entry if identical"""
+        if deployment_id in self.deployments:
+            deployment = self.deployments[deployment_id]
+            now = datetime.utcnow()
+            position, is_new = self.build_logs[deployment_id].append(now, level, step, message)
+            if is_new:
+                self.log_index.add(deployment_id, position, now, message)
+            deployment.updated_at = now
+            self._bump_version(deployment_id)
+    
+    def update_deployment_details(self, deployment_id: str, deployment_type: Optional[str], requirements: Optional[str]):
+        """Update AI-extracted deployment details"""
         if deployment_id in self.deployments:
             deployment = self.deployments[deployment_id]
-            log_entry = BuildLog(
-                timestamp=datetime.utcnow(),
-                level=level,
-                message=message,
-                step=step
-            )
-            deployment.build_logs.append(log_entry)
+            deployment.deployment_type = deployment_type
+            deployment.requirements = requirements
             deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
     
     def update_render_service_id(self, deployment_id: str, service_id: str):
         """Update Render service ID"""
@@ -66,6 +94,55 @@ class DeploymentStorage:
             deployment = self.deployments[deployment_id]
             deployment.render_service_id = service_id
             deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
+    
+    def update_render_deploy_id(self, deployment_id: str, render_deploy_id: str):
+        """Update the Render deploy ID"""
+        if deployment_id in self.deployments:
+            deployment = self.deployments[deployment_id]
+            deployment.render_deploy_id = render_deploy_id
+            deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
+    
+    def update_app_type(self, deployment_id: str, app_type: str):
+        """Update the app type detected from the repository"""
+        if deployment_id in self.deployments:
+            deployment = self.deployments[deployment_id]
+            deployment.app_type = app_type
+            deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
+    
+    def update_build_plan(self, deployment_id: str, build_plan: Optional[Dict]):
+        """Update the build plan derived from the repository"""
+        if deployment_id in self.deployments:
+            deployment = self.deployments[deployment_id]
+            deployment.build_plan = build_plan
+            deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
+    
+    def update_commit_sha(self, deployment_id: str, commit_sha: str):
+        """Update the commit that went live"""
+        if deployment_id in self.deployments:
+            deployment = self.deployments[deployment_id]
+            deployment.commit_sha = commit_sha
+            deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
+    
+    def mark_promotion(self, deployment_id: str, promoted_from: str):
+        """Link a promotion deployment to the deployment it was promoted from"""
+        if deployment_id in self.deployments:
+            deployment = self.deployments[deployment_id]
+            deployment.promoted_from = promoted_from
+            deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
+    
+    def mark_rollback(self, deployment_id: str, rollback_of: str):
+        """Link a rollback deployment to the deployment it rolled back"""
+        if deployment_id in self.deployments:
+            deployment = self.deployments[deployment_id]
+            deployment.rollback_of = rollback_of
+            deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
     
     def mark_webhook_configured(self, deployment_id: str):
         """Mark webhook as configured"""
@@ -73,11 +150,21 @@ class DeploymentStorage:
             deployment = self.deployments[deployment_id]
             deployment.webhook_configured = True
             deployment.updated_at = datetime.utcnow()
+            self._bump_version(deployment_id)
     
     def get_deployment(self, deployment_id: str) -> Optional[DeploymentRecord]:
-        """Get a specific deployment by ID"""
+        """Get a specific deployment by ID (without build logs; see with_build_logs)"""
         return self.deployments.get(deployment_id)
     
+    def get_build_logs(self, deployment_id: str) -> List[BuildLog]:
+        """Get the build logs of a deployment"""
+        buffer = self.build_logs.get(deployment_id)
+        return buffer.to_list() if buffer else []
+    
+    def with_build_logs(self, deployment: DeploymentRecord) -> DeploymentRecord:
+        """Return a copy of a deployment record with its build logs filled in, for API responses"""
+        return deployment.model_copy(update={"build_logs": self.get_build_logs(deployment.id)})
+    
     def get_deployments_by_repo(self, repo_url: str) -> List[DeploymentRecord]:
         """Get all deployments for a specific repository"""
         return [d for d in self.deployments.values() if d.repo_url == repo_url]
@@ -89,12 +176,62 @@ class DeploymentStorage:
             return max(deployments, key=lambda x: x.created_at)
         return None
     
+    def get_last_successful_deployment(self, render_service_id: str, before: datetime, exclude_id: str = None) -> Optional[DeploymentRecord]:
+        """Get the latest completed deployment of a Render service created before a point in time"""
+        candidates = [
+            d for d in self.deployments.values()
+            if d.render_service_id == render_service_id and d.render_deploy_id
+            and d.status == DeploymentStatus.completed and d.created_at < before and d.id != exclude_id
+        ]
+        if candidates:
+            return max(candidates, key=lambda x: x.created_at)
+        return None
+    
+    def get_environment_service(self, repo_url: str, environment: str) -> Optional[DeploymentRecord]:
+        """Get the latest completed deployment of a repository in an environment that has a Render service"""
+        candidates = [
+            d for d in self.deployments.values()
+            if d.repo_url == repo_url and d.environment == environment
+            and d.render_service_id and d.status == DeploymentStatus.completed
+        ]
+        if candidates:
+            return max(candidates, key=lambda x: x.created_at)
+        return None
+    
     def get_all_deployments(self, limit: int = 50) -> List[DeploymentRecord]:
         """Get all deployments, sorted by creation date (newest first)"""
         deployments = list(self.deployments.values())
         deployments.sort(key=lambda x: x.created_at, reverse=True)
         return deployments[:limit]
     
+    def search_build_logs(self, query: str, environment: Optional[str] = None, since: Optional[datetime] = None, limit: int = 100) -> List[Dict]:
+        """
+        Find build log lines containing every word of the query, newest first,
+        grouped by deployment in order of each deployment's most recent match.
+        """
+        results: Dict[str, Dict] = {}
+        matched = 0
+        for deployment_id, position in self.log_index.search(query, since):
+            deployment = self.deployments.get(deployment_id)
+            if deployment is None or (environment and deployment.environment != environment):
+                continue
+            
+            result = results.get(deployment_id)
+            if result is None:
+                result = results[deployment_id] = {
+                    "deployment_id": deployment_id,
+                    "repo_url": deployment.repo_url,
+                    "environment": deployment.environment,
+                    "status": deployment.status,
+                    "matches": []
+                }
+            result["matches"].append(self.build_logs[deployment_id].get(position))
+            
+            matched += 1
+            if matched >= limit:
+                break
+        return list(results.values())
+    
     def get_deployments_by_environment(self, environment: str) -> List[DeploymentRecord]:
         """Get all deployments for a specific environment"""
         return [d for d in self.deployments.values() if d.environment == environment]
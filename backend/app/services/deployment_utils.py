@@ -1,9 +1,14 @@
 from typing import Optional
+from app.utils.intent_matcher import extract_entities
+
+# Order in which prompt environments have always been resolved here; unlike the
+# chat fallback parser, only explicit keywords count ("test" or "local" do not)
+PROMPT_ENVIRONMENT_ORDER = ["dev", "qa", "beta", "prod"]
 
 def extract_environment_from_prompt(prompt: str) -> Optional[str]:
-    prompt = prompt.lower()
-    for env in ["dev", "qa", "beta", "prod"]:
-        if env in prompt:
+    named = extract_entities(prompt).environments
+    for env in PROMPT_ENVIRONMENT_ORDER:
+        if env in named:
             return env
     return None
 
@@ -0,0 +1,89 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w{2,}')
+
+# Postings scanned per step of a multi-word query
+SEARCH_CHUNK_SIZE = 4096
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of at least two characters, without duplicates"""
+    return list(dict.fromkeys(TOKEN_PATTERN.findall(text.lower())))
+
+class BuildLogIndex:
+    """
+    Inverted index over build log messages, maintained incrementally as logs are added.
+    Entries are numbered in insertion order, so every posting list is sorted by time
+    and queries can walk them newest first and stop early.
+    """
+    
+    def __init__(self):
+        self._postings: Dict[str, array] = {}  # token -> entry numbers
+        self._deployment_ids: List[str] = []  # Interned deployment IDs
+        self._deployment_numbers: Dict[str, int] = {}
+        # Per-entry columns, indexed by entry number
+        self._entry_deployments = array('L')
+        self._entry_positions = array('L')
+        self._entry_timestamps = array('d')
+    
+    def __len__(self) -> int:
+        return len(self._entry_timestamps)
+    
+    def add(self, deployment_id: str, position: int, timestamp: datetime, message: str):
+        """Index one log line; position is its index in the deployment's build_logs"""
+        number = self._deployment_numbers.get(deployment_id)
+        if number is None:
+            number = len(self._deployment_ids)
+            self._deployment_numbers[deployment_id] = number
+            self._deployment_ids.append(deployment_id)
+        
+        entry = len(self._entry_timestamps)
+        self._entry_deployments.append(number)
+        self._entry_positions.append(position)
+        self._entry_timestamps.append(timestamp.timestamp())
+        
+        for token in tokenize(message):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array('L')
+            postings.append(entry)
+    
+    def search(self, query: str, since: Optional[datetime] = None) -> Iterator[Tuple[str, int]]:
+        """
+        Yield (deployment_id, position) for lines containing every query token, newest first.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return
+        
+        postings = [self._postings.get(token) for token in tokens]
+        if any(p is None for p in postings):
+            return
+        
+        # Walk the rarest token's postings newest first, in chunks, intersecting each chunk
+        # with the matching range of the other postings using set operations
+        postings.sort(key=len)
+        rarest, others = postings[0], postings[1:]
+        cutoff = since.timestamp() if since else None
+        
+        hi = len(rarest)
+        while hi > 0:
+            lo = max(0, hi - SEARCH_CHUNK_SIZE)
+            chunk = rarest[lo:hi]
+            candidates = set(chunk)
+            for other in others:
+                candidates.intersection_update(other[bisect_left(other, chunk[0]):bisect_right(other, chunk[-1])])
+                if not candidates:
+                    break
+            
+            for entry in sorted(candidates, reverse=True):
+                if cutoff is not None and self._entry_timestamps[entry] < cutoff:
+                    return
+                yield self._deployment_ids[self._entry_deployments[entry]], self._entry_positions[entry]
+            
+            if cutoff is not None and self._entry_timestamps[chunk[0]] < cutoff:
+                return
+            hi = lo
@@ -0,0 +1,100 @@
+from collections import Counter, deque
+from datetime import datetime
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+
+# GitHub lists at most this many commits in a push payload; longer pushes are truncated
+MAX_PAYLOAD_COMMITS = 20
+
+class RedeployFilter:
+    """
+    Decides whether a push needs a new build: pushes that only touch ignored paths,
+    or whose head commit is already deployed on the service, are skipped.
+    """
+
+    def __init__(self, ignore_paths: List[str], path_rules: Dict[str, Dict[str, List[str]]], max_recent: int = 100):
+        self.ignore_paths = ignore_paths
+        self.path_rules = {repo.lower(): rules for repo, rules in path_rules.items()}
+        self.deployed_shas: Dict[str, str] = {}  # Render service ID -> commit SHA that went live
+        self.building_shas: Dict[str, str] = {}  # Render service ID -> commit SHA being built
+        self.skipped = Counter()  # Skip reason -> count
+        self.triggered = 0
+        self.recent_skips = deque(maxlen=max_recent)
+
+    def _rules_for(self, repo_full_name: str) -> Tuple[List[str], List[str]]:
+        """Get the (include, ignore) path patterns for a repository"""
+        rules = self.path_rules.get(repo_full_name.lower(), {})
+        return rules.get("include", []), rules.get("ignore", self.ignore_paths)
+
+    def _is_relevant(self, path: str, include: List[str], ignore: List[str]) -> bool:
+        if include and not any(fnmatchcase(path, pattern) for pattern in include):
+            return False
+        return not any(fnmatchcase(path, pattern) for pattern in ignore)
+
+    def check(self, repo_full_name: str, service_id: str, head_sha: str, commits: List[Dict]) -> Optional[str]:
+        """Return the reason to skip the push, or None if it should be deployed"""
+        if head_sha and self.deployed_shas.get(service_id) == head_sha:
+            return "already_deployed"
+        if head_sha and self.building_shas.get(service_id) == head_sha:
+            return "already_building"
+
+        # Without a complete list of changed paths we can't prove the push is irrelevant
+        if not commits or len(commits) >= MAX_PAYLOAD_COMMITS:
+            return None
+
+        include, ignore = self._rules_for(repo_full_name)
+        for commit in commits:
+            if not any(key in commit for key in ("added", "modified", "removed")):
+                return None
+            for key in ("added", "modified", "removed"):
+                for path in commit.get(key, []):
+                    if self._is_relevant(path, include, ignore):
+                        return None
+        return "no_relevant_changes"
+
+    def mark_deployed(self, service_id: str, sha: Optional[str]):
+        """Record the commit a service is live on"""
+        if service_id and sha:
+            self.deployed_shas[service_id] = sha
+            if self.building_shas.get(service_id) == sha:
+                del self.building_shas[service_id]
+
+    def mark_failed(self, service_id: str, sha: Optional[str]):
+        """Forget a build that didn't go live, so a later push or redelivery of the commit is built again"""
+        if self.building_shas.get(service_id) == sha:
+            del self.building_shas[service_id]
+
+    def record_trigger(self, service_id: str, sha: Optional[str]):
+        """Record a push that was sent to the provider for a build"""
+        self.triggered += 1
+        if service_id and sha:
+            self.building_shas[service_id] = sha
+
+    def record_skip(self, repo_full_name: str, service_id: str, sha: Optional[str], reason: str):
+        """Record a push that was not built"""
+        self.skipped[reason] += 1
+        self.recent_skips.append({
+            "repository": repo_full_name,
+            "service_id": service_id,
+            "commit": sha,
+            "reason": reason,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+    def get_stats(self) -> Dict:
+        """Return counts of triggered and skipped pushes and the most recent skips"""
+        return {
+            "triggered": self.triggered,
+            "skipped": dict(self.skipped),
+            "total_skipped": sum(self.skipped.values()),
+            "tracked_services": len(self.deployed_shas),
+            "building_services": len(self.building_shas),
+            "recent_skips": list(reversed(self.recent_skips))
+        }
+
+# Global instance
+redeploy_filter = RedeployFilter(
+    ignore_paths=settings.redeploy_ignore_paths,
+    path_rules=settings.redeploy_path_rules
+)
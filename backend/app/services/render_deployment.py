@@ -1,17 +1,39 @@
 import os
-import requests
 import json
 import subprocess
+import time
 import asyncio
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set
 from datetime import datetime
 from app.services.deployment_storage import deployment_storage
+from app.services.redeploy_filter import redeploy_filter
+from app.services.deploy_eta import deploy_duration_tracker
+from app.services.app_detection import detect_services
+from app.utils.github import redeploy_hook_registered
+from app.utils.http import get_requests
+
+class BuildLogCursor:
+    """Position in a provider's build log stream, so each poll only fetches new lines."""
+    
+    __slots__ = ("start_time", "seen_ids", "ingested", "truncated")
+    
+    def __init__(self, start_time: Optional[str] = None):
+        self.start_time = start_time  # Timestamp of the newest line ingested, initially when the deploy was created
+        self.seen_ids: Set[str] = set()  # IDs of ingested lines sharing start_time (startTime is inclusive)
+        self.ingested = 0
+        self.truncated = False
 
 class RenderDeploymentService:
     def __init__(self):
         self.render_api_key = os.getenv('RENDER_API_KEY')
-        self.render_api_base = "https://api.render.com/v1"
+        self.render_api_base = os.getenv('RENDER_API_BASE', "https://api.render.com/v1")
         self.render_region = os.getenv('RENDER_REGION', 'oregon')  # Configurable region
+        self.render_owner_id = os.getenv('RENDER_OWNER_ID')  # Workspace ID, required by the logs API
+        self.build_log_max_lines = int(os.getenv('RENDER_BUILD_LOG_MAX_LINES', '5000'))  # Provider lines kept per deployment
+        self.build_log_page_size = 100
+        self.build_log_max_pages = 10  # Pages fetched per poll, so one tick never runs unbounded
+        self.manual_deploy_services: Set[str] = set()  # Services confirmed to have Render's auto-deploy off
+        self._redeploy_watchers: Set[asyncio.Task] = set()
         
     async def deploy_to_render(self, repo_url: str, environment: str, deployment_id: str) -> str:
         """
@@ -21,19 +43,53 @@ class RenderDeploymentService:
             deployment_storage.add_build_log(deployment_id, "info", f"🚀 Starting Render deployment for {repo_url} to {environment}", "initialization")
             
             # Step 1: Clone and analyze repository
+            app_type = await self.prepare_repository(repo_url, [deployment_id])
+        except Exception as e:
+            deployment_storage.add_build_log(deployment_id, "error", f"❌ Render deployment failed: {str(e)}", "failed")
+            raise e
+        
+        return await self.deploy_prepared(repo_url, environment, deployment_id, app_type)
+    
+    async def prepare_repository(self, repo_url: str, deployment_ids: List[str]) -> str:
+        """
+        Clone a repository once and detect its app type, logging to every deployment that shares it.
+        """
+        for deployment_id in deployment_ids:
             deployment_storage.add_build_log(deployment_id, "info", f"📥 Cloning repository: {repo_url}", "cloning")
-            repo_path = await self._clone_repository(repo_url, deployment_id)
-            
-            app_type = self._detect_app_type(repo_path)
+        repo_path = await self._clone_repository(repo_url, deployment_ids[0])
+        
+        services = await asyncio.to_thread(detect_services, repo_path)
+        
+        # The first service (by path) is deployed; the others are reported so they can be deployed separately
+        app_type = services[0]["app_type"]
+        build_plan = services[0]["build_plan"]
+        for deployment_id in deployment_ids:
+            deployment_storage.update_app_type(deployment_id, app_type)
+            deployment_storage.update_build_plan(deployment_id, build_plan)
             deployment_storage.add_build_log(deployment_id, "info", f"🔍 Detected app type: {app_type}", "analysis")
-            
+            if len(services) > 1:
+                found = ", ".join(f"{service['root_dir']} ({service['app_type']})" for service in services)
+                deployment_storage.add_build_log(deployment_id, "info", f"🗂️ Monorepo services: {found}; deploying {services[0]['root_dir']}", "analysis")
+            if build_plan and "build_command" in build_plan:
+                deployment_storage.add_build_log(deployment_id, "info", f"📦 Build with {build_plan['package_manager']}: {build_plan['build_command']}", "analysis")
+        return app_type
+    
+    async def deploy_prepared(self, repo_url: str, environment: str, deployment_id: str, app_type: str) -> str:
+        """
+        Create, configure and deploy the Render service for an already analyzed repository.
+        """
+        try:
             # Step 2: Create Render service
             deployment_storage.add_build_log(deployment_id, "info", "🏗️ Creating Render service", "service_creation")
+            deployment = deployment_storage.get_deployment(deployment_id)
             service_id = await self._create_render_service(
                 repo_url=repo_url,
                 environment=environment,
                 app_type=app_type,
-                deployment_id=deployment_id
+                deployment_id=deployment_id,
+                # Render keeps building on push until our redeploy webhook is confirmed
+                auto_deploy=not redeploy_hook_registered(repo_url),
+                build_plan=deployment.build_plan if deployment else None
             )
             
             # Store service ID for webhook configuration
@@ -45,7 +101,7 @@ class RenderDeploymentService:
             
             # Step 4: Deploy the service
             deployment_storage.add_build_log(deployment_id, "info", "🚀 Triggering deployment", "deployment")
-            deployment_url = await self._deploy_service(service_id, environment, deployment_id)
+            deployment_url = await self._deploy_service(service_id, environment, deployment_id, repo_url=repo_url, app_type=app_type)
             
             deployment_storage.add_build_log(deployment_id, "info", f"✅ Render deployment completed: {deployment_url}", "completed")
             return deployment_url
@@ -54,6 +110,63 @@ class RenderDeploymentService:
             deployment_storage.add_build_log(deployment_id, "error", f"❌ Render deployment failed: {str(e)}", "failed")
             raise e
     
+    async def promote(self, repo_url: str, environment: str, deployment_id: str, app_type: str, commit_sha: str, service_id: Optional[str] = None, build_plan: Optional[Dict] = None) -> str:
+        """
+        Deploy an already built commit to another environment: no clone or analysis,
+        only the environment variables from _get_service_config differ.
+        Reuses the environment's existing service when there is one.
+        """
+        try:
+            if service_id:
+                deployment_storage.add_build_log(deployment_id, "info", f"🔧 Updating {environment} environment variables", "service_creation")
+                await self._update_env_vars(service_id, app_type, environment, repo_url, build_plan)
+            else:
+                # Promoted environments only move by promotion, not on every push
+                deployment_storage.add_build_log(deployment_id, "info", f"🏗️ Creating Render service for {environment}", "service_creation")
+                service_id = await self._create_render_service(
+                    repo_url=repo_url,
+                    environment=environment,
+                    app_type=app_type,
+                    deployment_id=deployment_id,
+                    auto_deploy=False,
+                    build_plan=build_plan
+                )
+            deployment_storage.update_render_service_id(deployment_id, service_id)
+            
+            deployment_storage.add_build_log(deployment_id, "info", f"🚀 Deploying commit {commit_sha[:7]}", "deployment")
+            deployment_url = await self._deploy_service(service_id, environment, deployment_id, repo_url=repo_url, app_type=app_type, commit_id=commit_sha)
+            
+            deployment_storage.add_build_log(deployment_id, "info", f"✅ Promotion completed: {deployment_url}", "completed")
+            return deployment_url
+            
+        except Exception as e:
+            deployment_storage.add_build_log(deployment_id, "error", f"❌ Promotion failed: {str(e)}", "failed")
+            raise e
+    
+    async def _update_env_vars(self, service_id: str, app_type: str, environment: str, repo_url: str, build_plan: Optional[Dict] = None):
+        """Replace a service's environment variables with those for the given environment."""
+        requests = get_requests()
+        
+        if not self.render_api_key:
+            raise Exception("RENDER_API_KEY not configured")
+        
+        service_config = self._get_service_config(app_type, environment, repo_url, build_plan)
+        headers = {
+            "Authorization": f"Bearer {self.render_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        response = await asyncio.to_thread(
+            requests.put,
+            f"{self.render_api_base}/services/{service_id}/env-vars",
+            headers=headers,
+            json=service_config["env_vars"],
+            timeout=10
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to update environment variables: {response.text}")
+    
     async def _clone_repository(self, repo_url: str, deployment_id: str) -> str:
         """Clone repository to temporary directory."""
         repo_path = f"/tmp/deployments/{deployment_id}"
@@ -75,36 +188,18 @@ class RenderDeploymentService:
             raise Exception("Repository cloning timed out")
     
     def _detect_app_type(self, repo_path: str) -> str:
-        """Detect application type from repository."""
-        import os
-        
-        # Check for package.json (React/Node.js)
-        if os.path.exists(os.path.join(repo_path, "package.json")):
-            with open(os.path.join(repo_path, "package.json"), "r") as f:
-                package_data = json.load(f)
-                if "react" in package_data.get("dependencies", {}):
-                    return "react"
-                else:
-                    return "nodejs"
-        
-        # Check for requirements.txt (Python)
-        elif os.path.exists(os.path.join(repo_path, "requirements.txt")):
-            return "python"
-        
-        # Check for Dockerfile
-        elif os.path.exists(os.path.join(repo_path, "Dockerfile")):
-            return "docker"
-        
-        # Default to static site
-        return "static"
+        """Detect the application type of the repository's first service (see detect_services)."""
+        return detect_services(repo_path)[0]["app_type"]
     
-    async def _create_render_service(self, repo_url: str, environment: str, app_type: str, deployment_id: str) -> str:
+    async def _create_render_service(self, repo_url: str, environment: str, app_type: str, deployment_id: str, auto_deploy: bool = False, build_plan: Optional[Dict] = None) -> str:
         """Create a new Render service."""
+        requests = get_requests()
+        
         if not self.render_api_key:
             raise Exception("RENDER_API_KEY not configured")
         
         # Determine service configuration based on app type
-        service_config = self._get_service_config(app_type, environment, repo_url)
+        service_config = self._get_service_config(app_type, environment, repo_url, build_plan)
         
         headers = {
             "Authorization": f"Bearer {self.render_api_key}",
@@ -122,13 +217,18 @@ class RenderDeploymentService:
             "buildCommand": service_config["build_command"],
             "startCommand": service_config["start_command"],
             "envVars": service_config["env_vars"],
-            "autoDeploy": True  # Enable automatic deployment on push
+            # Off when pushes are built through our webhook and the redeploy filter instead
+            "autoDeploy": "yes" if auto_deploy else "no"
         }
+        if build_plan and build_plan.get("root_dir"):
+            payload["rootDir"] = build_plan["root_dir"]  # Monorepo service directory
         
-        response = requests.post(
+        response = await asyncio.to_thread(
+            requests.post,
             f"{self.render_api_base}/services",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=30
         )
         
         if response.status_code != 201:
@@ -154,8 +254,22 @@ class RenderDeploymentService:
         except Exception as e:
             print(f"Warning: Could not configure webhook: {str(e)}")
     
-    def _get_service_config(self, app_type: str, environment: str, repo_url: str) -> Dict:
-        """Get service configuration based on app type."""
+    def _get_service_config(self, app_type: str, environment: str, repo_url: str, build_plan: Optional[Dict] = None) -> Dict:
+        """Get service configuration based on app type, using the repository's build plan when there is one."""
+        config = self._get_default_service_config(app_type, environment, repo_url)
+        if not build_plan or "build_command" not in build_plan:
+            return config
+        
+        plan_env_vars = {env_var["key"]: env_var for env_var in build_plan.get("env_vars", [])}
+        return {
+            **config,
+            "build_command": build_plan["build_command"],
+            "start_command": build_plan["start_command"],
+            "env_vars": [plan_env_vars.pop(env_var["key"], env_var) for env_var in config["env_vars"]] + list(plan_env_vars.values())
+        }
+    
+    def _get_default_service_config(self, app_type: str, environment: str, repo_url: str) -> Dict:
+        """Get the generic service configuration for an app type."""
         base_config = {
             "env": "node",
             "build_command": "npm install",
@@ -172,6 +286,11 @@ class RenderDeploymentService:
                 "build_command": "npm install && npm run build",
                 "start_command": "npm start"
             }
+        elif app_type == "nodejs":
+            return {
+                **base_config,
+                "env_vars": base_config["env_vars"] + [{"key": "NODE_VERSION", "value": "20"}]
+            }
         elif app_type == "python":
             return {
                 "env": "python",
@@ -204,8 +323,10 @@ class RenderDeploymentService:
                 ]
             }
     
-    async def _deploy_service(self, service_id: str, environment: str, deployment_id: str) -> str:
+    async def _deploy_service(self, service_id: str, environment: str, deployment_id: str, repo_url: str = "", app_type: str = "", commit_id: Optional[str] = None) -> str:
         """Deploy the service and return the URL."""
+        requests = get_requests()
+        
         if not self.render_api_key:
             raise Exception("RENDER_API_KEY not configured")
         
@@ -215,9 +336,12 @@ class RenderDeploymentService:
         }
         
         # Trigger deployment
-        deploy_response = requests.post(
+        deploy_response = await asyncio.to_thread(
+            requests.post,
             f"{self.render_api_base}/services/{service_id}/deploys",
-            headers=headers
+            headers=headers,
+            json={"commitId": commit_id} if commit_id else None,
+            timeout=10
         )
         
         if deploy_response.status_code != 201:
@@ -225,24 +349,222 @@ class RenderDeploymentService:
         
         # Wait for deployment to complete
         deployment_id_render = deploy_response.json()["id"]
-        deployment_url = await self._wait_for_deployment(service_id, deployment_id_render, deployment_id)
+        deployment_storage.update_render_deploy_id(deployment_id, deployment_id_render)
+        deployment_url = await self._wait_for_deployment(service_id, deployment_id_render, deployment_id, (repo_url, app_type, environment))
         
         return deployment_url
     
-    async def _wait_for_deployment(self, service_id: str, deployment_id: str, our_deployment_id: str) -> str:
-        """Wait for deployment to complete and return service URL."""
+    async def disable_auto_deploy(self, service_id: str):
+        """Turn off Render's own build-on-push for a service, so only the redeploy filter triggers builds."""
+        requests = get_requests()
+        
+        if service_id in self.manual_deploy_services:
+            return
+        
+        response = await asyncio.to_thread(
+            requests.patch,
+            f"{self.render_api_base}/services/{service_id}",
+            headers={"Authorization": f"Bearer {self.render_api_key}", "Content-Type": "application/json"},
+            json={"autoDeploy": "no"},
+            timeout=10
+        )
+        if response.status_code == 200:
+            self.manual_deploy_services.add(service_id)
+        else:
+            print(f"⚠️ Could not turn off auto-deploy for {service_id}: {response.status_code} | {response.text}")
+    
+    async def trigger_redeploy(self, service_id: str, commit_id: str) -> str:
+        """Start a build of a pushed commit on an existing service and return the Render deploy ID."""
+        requests = get_requests()
+        
+        response = await asyncio.to_thread(
+            requests.post,
+            f"{self.render_api_base}/services/{service_id}/deploys",
+            headers={"Authorization": f"Bearer {self.render_api_key}", "Content-Type": "application/json"},
+            json={"commitId": commit_id},
+            timeout=10
+        )
+        if response.status_code != 201:
+            raise Exception(f"Failed to trigger redeployment: {response.text}")
+        return response.json()["id"]
+    
+    def watch_redeploy(self, service_id: str, render_deploy_id: str, commit_id: str, our_deployment_id: str, duration_key: tuple):
+        """
+        Follow a webhook-triggered build in the background. The commit only counts as deployed
+        once it is live (see _wait_for_deployment); a failed build lets the same commit be retried.
+        """
+        async def watch():
+            try:
+                await self._wait_for_deployment(service_id, render_deploy_id, our_deployment_id, duration_key)
+            except Exception as e:
+                redeploy_filter.mark_failed(service_id, commit_id)
+                print(f"❌ Redeployment of {commit_id[:7]} on {service_id} failed: {str(e)}")
+        
+        task = asyncio.create_task(watch())
+        self._redeploy_watchers.add(task)
+        task.add_done_callback(self._redeploy_watchers.discard)
+    
+    async def find_previous_deploy(self, service_id: str) -> Optional[str]:
+        """Find the most recent successfully built deploy of a service on Render before the one live now."""
+        requests = get_requests()
+        
+        if not self.render_api_key:
+            raise Exception("RENDER_API_KEY not configured")
+        
         headers = {
             "Authorization": f"Bearer {self.render_api_key}"
         }
         
-        max_attempts = 30  # 5 minutes max
-        attempt = 0
+        response = await asyncio.to_thread(
+            requests.get,
+            f"{self.render_api_base}/services/{service_id}/deploys",
+            headers=headers,
+            params={"limit": 20},
+            timeout=10
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to list deploys: {response.text}")
+        
+        # Deploys are listed newest first; the first "live" one is what the service runs now
+        # (possibly a webhook redeploy we never recorded), "deactivated" ones were live before it
+        current_seen = False
+        for item in response.json():
+            deploy = item.get("deploy", item)
+            status = deploy.get("status")
+            if status == "live" and not current_seen:
+                current_seen = True
+            elif status in ("live", "deactivated"):
+                return deploy["id"]
+        return None
+    
+    async def rollback_service(self, service_id: str, render_deploy_id: str, our_deployment_id: str, repo_url: str, environment: str) -> str:
+        """
+        Re-activate a previously built deploy of a service (no rebuild) and return the service URL.
+        """
+        requests = get_requests()
+        
+        if not self.render_api_key:
+            raise Exception("RENDER_API_KEY not configured")
+        
+        headers = {
+            "Authorization": f"Bearer {self.render_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        deployment_storage.add_build_log(our_deployment_id, "info", f"⏪ Re-activating deploy {render_deploy_id}", "rollback")
+        rollback_response = await asyncio.to_thread(
+            requests.post,
+            f"{self.render_api_base}/services/{service_id}/rollback",
+            headers=headers,
+            json={"deployId": render_deploy_id},
+            timeout=10
+        )
+        
+        if rollback_response.status_code not in (200, 201):
+            raise Exception(f"Failed to trigger rollback: {rollback_response.text}")
         
-        while attempt < max_attempts:
+        # The rollback is itself a new deploy on Render; track it like any other
+        rollback_deploy_id = rollback_response.json()["id"]
+        deployment_storage.update_render_deploy_id(our_deployment_id, rollback_deploy_id)
+        return await self._wait_for_deployment(service_id, rollback_deploy_id, our_deployment_id, (repo_url, "rollback", environment))
+    
+    async def _ingest_build_logs(self, service_id: str, our_deployment_id: str, cursor: BuildLogCursor):
+        """
+        Append the service's new build output to our build logs, starting from the cursor.
+        At most build_log_max_lines provider lines are kept per deployment.
+        The logs API can't filter by deploy, so the cursor's start time keeps earlier builds out.
+        """
+        requests = get_requests()
+        
+        if not self.render_owner_id or cursor.truncated:
+            return
+        
+        headers = {
+            "Authorization": f"Bearer {self.render_api_key}"
+        }
+        params = {
+            "ownerId": self.render_owner_id,
+            "resource": service_id,
+            "type": "build",
+            "direction": "forward",
+            "limit": self.build_log_page_size
+        }
+        start_time = cursor.start_time
+        
+        for _ in range(self.build_log_max_pages):
+            if start_time:
+                params["startTime"] = start_time
+            
+            try:
+                response = await asyncio.to_thread(
+                    requests.get, f"{self.render_api_base}/logs", headers=headers, params=params, timeout=10
+                )
+            except Exception as e:
+                print(f"Warning: Could not fetch build logs: {str(e)}")
+                return
+            
+            if response.status_code != 200:
+                print(f"Warning: Could not fetch build logs: {response.status_code} | {response.text}")
+                return
+            
+            data = response.json()
+            ingested_before = cursor.ingested
+            for entry in data.get("logs", []):
+                if entry.get("id") in cursor.seen_ids:
+                    continue
+                
+                timestamp = entry.get("timestamp")
+                if timestamp != cursor.start_time:
+                    cursor.start_time = timestamp
+                    cursor.seen_ids = set()
+                cursor.seen_ids.add(entry.get("id"))
+                
+                labels = {label.get("name"): label.get("value") for label in entry.get("labels", [])}
+                level = "error" if labels.get("level") == "error" else "info"
+                deployment_storage.add_build_log(our_deployment_id, level, entry.get("message", ""), "build_output")
+                
+                cursor.ingested += 1
+                if cursor.ingested >= self.build_log_max_lines:
+                    cursor.truncated = True
+                    deployment_storage.add_build_log(our_deployment_id, "warning", f"✂️ Build output truncated after {cursor.ingested} lines", "build_output")
+                    return
+            
+            if not data.get("hasMore"):
+                return
+            next_start_time = data.get("nextStartTime") or cursor.start_time
+            # A page of already-seen lines that doesn't advance the cursor would repeat forever
+            if next_start_time == start_time and cursor.ingested == ingested_before:
+                return
+            start_time = next_start_time
+    
+    async def _wait_for_deployment(self, service_id: str, deployment_id: str, our_deployment_id: str, duration_key: tuple = ("", "", "")) -> str:
+        """
+        Wait for deployment to complete and return service URL.
+        Checks are scheduled around the expected duration learned from past deployments.
+        """
+        requests = get_requests()
+        
+        headers = {
+            "Authorization": f"Bearer {self.render_api_key}"
+        }
+        
+        estimate = deploy_duration_tracker.estimate(duration_key)
+        timeout = deploy_duration_tracker.timeout_for(duration_key)
+        if estimate:
+            deployment_storage.add_build_log(our_deployment_id, "info", f"⏱️ Expected to finish in about {estimate['median']:.0f}s", "deploying")
+        
+        started_at = time.monotonic()
+        last_status = None
+        log_cursor: Optional[BuildLogCursor] = None
+        
+        while True:
             # Check deployment status
-            deploy_response = requests.get(
+            deploy_response = await asyncio.to_thread(
+                requests.get,
                 f"{self.render_api_base}/services/{service_id}/deploys/{deployment_id}",
-                headers=headers
+                headers=headers,
+                timeout=10
             )
             
             if deploy_response.status_code != 200:
@@ -251,22 +573,35 @@ class RenderDeploymentService:
             deploy_data = deploy_response.json()
             status = deploy_data["status"]
             
-            # Update build logs based on status
-            if status == "building":
+            # Pull any build output produced since the last poll, ignoring the
+            # output of earlier builds on a reused service
+            if log_cursor is None:
+                log_cursor = BuildLogCursor(start_time=deploy_data.get("createdAt"))
+            await self._ingest_build_logs(service_id, our_deployment_id, log_cursor)
+            
+            # Update build logs when the status changes
+            if status == "building" and status != last_status:
                 deployment_storage.add_build_log(our_deployment_id, "info", "🔨 Building application", "building")
-            elif status == "deploying":
+            elif status == "deploying" and status != last_status:
                 deployment_storage.add_build_log(our_deployment_id, "info", "🚀 Deploying to Render", "deploying")
             elif status == "live":
                 # Get service URL
-                service_response = requests.get(
+                service_response = await asyncio.to_thread(
+                    requests.get,
                     f"{self.render_api_base}/services/{service_id}",
-                    headers=headers
+                    headers=headers,
+                    timeout=10
                 )
                 
                 if service_response.status_code != 200:
                     raise Exception(f"Failed to get service URL: {service_response.text}")
                 
                 service_data = service_response.json()
+                deploy_duration_tracker.record(duration_key, time.monotonic() - started_at)
+                commit_sha = (deploy_data.get("commit") or {}).get("id")
+                redeploy_filter.mark_deployed(service_id, commit_sha)
+                if commit_sha:
+                    deployment_storage.update_commit_sha(our_deployment_id, commit_sha)
                 deployment_storage.add_build_log(our_deployment_id, "info", "✅ Deployment successful", "completed")
                 return service_data["service"]["url"]
             
@@ -275,11 +610,16 @@ class RenderDeploymentService:
                 deployment_storage.add_build_log(our_deployment_id, "error", f"❌ Deployment failed: {error_msg}", "failed")
                 raise Exception(f"Deployment failed with status: {status}")
             
-            # Wait 10 seconds before checking again
-            await asyncio.sleep(10)
-            attempt += 1
+            last_status = status
+            elapsed = time.monotonic() - started_at
+            if elapsed >= timeout:
+                break
+            
+            # Wait until the next scheduled check
+            interval = deploy_duration_tracker.next_interval(elapsed, estimate)
+            await asyncio.sleep(min(interval, timeout - elapsed))
         
-        deployment_storage.add_build_log(our_deployment_id, "error", "⏰ Deployment timed out", "failed")
+        deployment_storage.add_build_log(our_deployment_id, "error", f"⏰ Deployment timed out after {timeout:.0f}s", "failed")
         raise Exception("Deployment timed out")
 
 # Global instance
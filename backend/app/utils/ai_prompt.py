@@ -1,21 +1,78 @@
-import os
 import json
 from typing import Dict, Optional
-from openai import OpenAI
+from app.config import settings
+from app.utils.openai_client import get_openai_client
+from app.utils.llm_limiter import llm_admission, LLMOverloadedError
+from app.utils.github import validate_repo_url
+from app.utils.extraction_cache import extraction_cache
+from app.utils.intent_matcher import extract_entities
 
-def extract_deployment_info(prompt: str) -> Dict:
+# Counters for how each extraction request was answered
+extraction_stats = {
+    "fast_path": 0,
+    "cache": 0,
+    "llm": 0,
+    "fallback": 0
+}
+
+def get_extraction_stats() -> Dict:
+    """Return extraction counters and the share of requests that skipped the LLM."""
+    total = sum(extraction_stats.values())
+    return {
+        **extraction_stats,
+        "total": total,
+        "fast_path_ratio": extraction_stats["fast_path"] / total if total else 0.0,
+        "cache": extraction_cache.get_stats()
+    }
+
+def fast_path_extract(prompt: str) -> Optional[Dict]:
+    """
+    Rule-based extraction for unambiguous prompts.
+    Returns a result only when the prompt contains exactly one valid GitHub URL and
+    exactly one target environment; otherwise returns None so the LLM can decide.
+    """
+    entities = extract_entities(prompt)
+    if len(entities.repo_urls) != 1 or not validate_repo_url(entities.repo_url):
+        return None
+    
+    environment = entities.unambiguous_environment
+    if environment is None:
+        return None
+    
+    return {
+        'repo_url': entities.repo_url,
+        'environment': environment,
+        'deployment_type': 'web application',
+        'description': prompt,
+        'requirements': None,
+        'needs_repo_url': False,
+        'needs_environment': False
+    }
+
+async def extract_deployment_info(prompt: str) -> Dict:
     """
     Use OpenAI to extract deployment information from natural language prompt.
+    Unambiguous prompts are answered by fast_path_extract without calling the LLM,
+    and LLM results are cached by normalized prompt.
     Returns a dictionary with repo_url, environment, and other deployment details.
     """
+    result = fast_path_extract(prompt)
+    if result is not None:
+        extraction_stats["fast_path"] += 1
+        print(f"⚡ Fast-path extraction used for: {prompt}")
+        return result
+    
+    cached = extraction_cache.get(prompt)
+    if cached is not None:
+        extraction_stats["cache"] += 1
+        print(f"📦 Cached extraction used for: {prompt}")
+        return cached
+    
     try:
-        # Initialize OpenAI client (v1.x syntax)
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
+        client = get_openai_client()
+        if client is None:
             raise Exception("OPENAI_API_KEY not found in environment variables")
         
-        client = OpenAI(api_key=api_key)
-        
         # Create a structured prompt for the AI
         system_prompt = """
         You are an AI assistant that extracts deployment information from user requests.
@@ -41,15 +98,17 @@ def extract_deployment_info(prompt: str) -> Dict:
         """
         
         # Make the API call (v1.x syntax)
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=500
-        )
+        async with llm_admission.admit():
+            response = await client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.1,
+                max_tokens=500,
+                timeout=settings.openai_extraction_timeout
+            )
         
         # Parse the response
         ai_response = response.choices[0].message.content.strip()
@@ -66,7 +125,8 @@ def extract_deployment_info(prompt: str) -> Dict:
                 result = json.loads(ai_response)
         except json.JSONDecodeError:
             # Fallback to regex parsing if JSON parsing fails
-            result = fallback_parse(prompt)
+            extraction_stats["fallback"] += 1
+            return fallback_parse(prompt)
         
         # Add missing fields if not present
         if 'needs_repo_url' not in result:
@@ -75,36 +135,25 @@ def extract_deployment_info(prompt: str) -> Dict:
         if 'needs_environment' not in result:
             result['needs_environment'] = result.get('environment') is None
         
+        extraction_stats["llm"] += 1
+        extraction_cache.put(prompt, result)
         return result
         
+    except LLMOverloadedError:
+        raise
     except Exception as e:
         print(f"Error in AI extraction: {str(e)}")
         # Fallback to regex parsing
+        extraction_stats["fallback"] += 1
         return fallback_parse(prompt)
 
 def fallback_parse(prompt: str) -> Dict:
     """
     Fallback parsing using regex when AI fails.
     """
-    import re
-    
-    # Extract GitHub URL
-    github_match = re.search(r'https://github\.com/[^\s]+', prompt)
-    repo_url = github_match.group(0) if github_match else None
-    
-    # Extract environment
-    env_patterns = {
-        'prod': r'\b(prod|production|live)\b',
-        'beta': r'\b(beta|staging)\b', 
-        'qa': r'\b(qa|test|testing)\b',
-        'dev': r'\b(dev|development|local)\b'
-    }
-    
-    environment = None  # Don't default to dev
-    for env, pattern in env_patterns.items():
-        if re.search(pattern, prompt, re.IGNORECASE):
-            environment = env
-            break
+    entities = extract_entities(prompt)
+    repo_url = entities.repo_url
+    environment = entities.environment  # Don't default to dev
     
     return {
         'repo_url': repo_url,
@@ -116,9 +165,9 @@ def fallback_parse(prompt: str) -> Dict:
         'needs_environment': environment is None
     }
 
-def parse_prompt(prompt: str) -> str:
+async def parse_prompt(prompt: str) -> str:
     """
     Legacy function for backward compatibility.
     """
-    result = extract_deployment_info(prompt)
+    result = await extract_deployment_info(prompt)
     return result.get('repo_url', '')
@@ -0,0 +1,155 @@
+import os
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.config import settings
+
+GITHUB_URL_PATTERN = re.compile(r'(?:https?://)?(?:www\.)?github\.com/([\w.-]+)/([\w.-]+)/?', re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def _canonical_url(match: re.Match) -> str:
+    repo = match.group(2).rstrip('.').removesuffix('.git')
+    return f"https://github.com/{match.group(1)}/{repo} "
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Build the cache key for a prompt: GitHub URLs are canonicalized and
+    whitespace and case differences are folded away.
+    """
+    key = GITHUB_URL_PATTERN.sub(_canonical_url, prompt)
+    return WHITESPACE_PATTERN.sub(' ', key).strip().casefold()
+
+class ExtractionCache:
+    """Bounded LRU cache with per-entry TTL for AI extraction results."""
+    
+    def __init__(self, max_size: int = 1024, ttl: float = 3600, path: Optional[str] = None, save_delay: float = 5.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.save_delay = save_delay
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None  # Pending write of the persistence file
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._load()
+    
+    def get(self, prompt: str) -> Optional[Dict]:
+        """Return a copy of the cached result for a prompt, or None"""
+        key = normalize_prompt(prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, result = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(result)
+    
+    def put(self, prompt: str, result: Dict):
+        """Store a result, evicting the least recently used entries beyond max_size"""
+        if self.max_size <= 0:
+            return
+        
+        key = normalize_prompt(prompt)
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._schedule_save()
+    
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self._schedule_save()
+    
+    def get_stats(self) -> Dict:
+        """Return cache size and hit-rate statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "persistent": self.path is not None
+        }
+    
+    def _load(self):
+        """Load unexpired entries from the persistence file, oldest first"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            now = time.time()
+            for key, expires_at, result in data.get("entries", [])[-self.max_size:]:
+                if expires_at > now:
+                    self._entries[key] = (expires_at, result)
+            print(f"📦 Loaded {len(self._entries)} cached extractions from {self.path}")
+        except Exception as e:
+            print(f"⚠️ Could not load extraction cache: {str(e)}")
+    
+    def _schedule_save(self):
+        """
+        Write the persistence file save_delay seconds after the first unsaved change (caller holds the lock),
+        so a burst of misses costs one write, done on a timer thread rather than in the request path.
+        """
+        if not self.path or self._save_timer is not None:
+            return
+        self._save_timer = threading.Timer(self.save_delay, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+    
+    def flush(self):
+        """Write pending changes to the persistence file now"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            snapshot = [[key, expires_at, result] for key, (expires_at, result) in self._entries.items()]
+        self._save(snapshot)
+    
+    def _save(self, snapshot: list):
+        """Write a snapshot of the entries to the persistence file atomically"""
+        if not self.path:
+            return
+        
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"entries": snapshot}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ Could not persist extraction cache: {str(e)}")
+
+# Global instance
+extraction_cache = ExtractionCache(
+    max_size=settings.extraction_cache_size,
+    ttl=settings.extraction_cache_ttl,
+    path=settings.extraction_cache_path,
+    save_delay=settings.extraction_cache_save_delay
+)
@@ -1,7 +1,83 @@
-import requests
 from app.config import settings
+from app.utils.http import get_requests
 
+import os
 import re
+import json
+import threading
+from typing import Dict, Optional
+
+class WebhookRegistry:
+    """
+    Repositories whose push webhook is confirmed to exist, so repeat deployments make no
+    GitHub hook calls. Entries remember the webhook URL they were confirmed for and are
+    dropped when GitHub reports the hook deleted.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._hooks: Dict[str, Dict] = {}  # "owner/repo" -> {"hook_id", "url"}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _key(self, full_name: str) -> str:
+        return full_name.lower()
+
+    def is_registered(self, full_name: str, url: str) -> bool:
+        entry = self._hooks.get(self._key(full_name))
+        return entry is not None and entry["url"] == url
+
+    def confirm(self, full_name: str, url: str, hook_id: Optional[int] = None):
+        with self._lock:
+            self._hooks[self._key(full_name)] = {"hook_id": hook_id, "url": url}
+            self._save()
+
+    def invalidate(self, full_name: str, hook_id: Optional[int] = None) -> bool:
+        """Forget a repository's hook (only if it is the given hook, when an ID is known on both sides)"""
+        with self._lock:
+            entry = self._hooks.get(self._key(full_name))
+            if entry is None:
+                return False
+            if hook_id is not None and entry["hook_id"] is not None and entry["hook_id"] != hook_id:
+                return False
+            del self._hooks[self._key(full_name)]
+            self._save()
+        print(f"🗑️ Webhook for {full_name} removed from the registry")
+        return True
+
+    def get_stats(self) -> Dict:
+        return {"registered": len(self._hooks), "path": self.path}
+
+    def _load(self):
+        """Load confirmed hooks from the persistence file"""
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r") as f:
+                self._hooks = json.load(f).get("hooks", {})
+            print(f"📦 Loaded {len(self._hooks)} registered webhooks from {self.path}")
+        except Exception as e:
+            print(f"⚠️ Could not load webhook registry: {str(e)}")
+
+    def _save(self):
+        """Write confirmed hooks to the persistence file atomically (caller holds the lock)"""
+        if not self.path:
+            return
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"hooks": self._hooks}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"⚠️ Could not persist webhook registry: {str(e)}")
+
+# Global instance
+webhook_registry = WebhookRegistry(path=settings.webhook_registry_path)
 
 def validate_repo_url(url) -> bool:
     """
@@ -21,23 +97,44 @@ def validate_repo_url(url) -> bool:
     
     return True
 
-def setup_webhook(repo_url):
-    print(f"Setting up webhook for {repo_url}")
-    
-    # Skip webhook setup if GitHub token is not provided
-    if not settings.github_token:
-        print("⚠️ GitHub token not provided. Skipping webhook setup.")
-        return
-    
+# Path of the route that rebuilds deployments on push (routers/deploy.py)
+REDEPLOY_WEBHOOK_PATH = "/deploy/webhook/github"
+
+def _full_name(repo_url) -> str:
+    """The "owner/repo" part of a GitHub repository URL"""
     # Convert HttpUrl to string if needed
     repo_url_str = str(repo_url) if hasattr(repo_url, '__str__') else repo_url
-    
-    # Extract owner and repo name from the URL
     try:
         parts = repo_url_str.rstrip("/").split("/")
         owner, repo = parts[-2], parts[-1]
     except IndexError:
         raise ValueError("Invalid GitHub repo URL.")
+    return f"{owner}/{repo}"
+
+def redeploy_hook_registered(repo_url) -> bool:
+    """
+    Whether the repository has a confirmed webhook pointing at the redeploy route,
+    i.e. pushes will be rebuilt by us and Render's own auto-deploy can be turned off.
+    """
+    if not settings.webhook_url.rstrip("/").endswith(REDEPLOY_WEBHOOK_PATH):
+        return False
+    return webhook_registry.is_registered(_full_name(repo_url), settings.webhook_url)
+
+def setup_webhook(repo_url):
+    # Skip webhook setup if GitHub token is not provided
+    if not settings.github_token:
+        print("⚠️ GitHub token not provided. Skipping webhook setup.")
+        return
+    
+    full_name = _full_name(repo_url)
+    owner, repo = full_name.split("/")
+    if webhook_registry.is_registered(full_name, settings.webhook_url):
+        print(f"ℹ️ Webhook already registered for {full_name}")
+        return
+
+    requests = get_requests()
+    
+    print(f"Setting up webhook for {repo_url}")
 
     api_url = f"https://api.github.com/repos/{owner}/{repo}/hooks"
     
@@ -49,7 +146,7 @@ def setup_webhook(repo_url):
     data = {
         "name": "web",
         "active": True,
-        "events": ["push"],
+        "events": ["push", "meta"],  # "meta" tells us if the hook is deleted
         "config": {
             "url": settings.webhook_url,
             "content_type": "json",
@@ -59,11 +156,22 @@ def setup_webhook(repo_url):
     }
 
     try:
-        response = requests.post(api_url, json=data, headers=headers)
+        # Warm the registry from the repository's existing hooks before creating one
+        response = requests.get(api_url, headers=headers, params={"per_page": 100}, timeout=10)
+        if response.status_code == 200:
+            for hook in response.json():
+                if hook.get("config", {}).get("url") == settings.webhook_url:
+                    webhook_registry.confirm(full_name, settings.webhook_url, hook.get("id"))
+                    print("ℹ️ Webhook already exists.")
+                    return
+
+        response = requests.post(api_url, json=data, headers=headers, timeout=10)
 
         if response.status_code == 201:
+            webhook_registry.confirm(full_name, settings.webhook_url, response.json().get("id"))
             print("✅ Webhook successfully created.")
         elif response.status_code == 422 and "already exists" in response.text:
+            webhook_registry.confirm(full_name, settings.webhook_url)
             print("ℹ️ Webhook already exists.")
         else:
             print(f"❌ Failed to create webhook: {response.status_code} | {response.text}")
@@ -72,3 +180,14 @@ def setup_webhook(repo_url):
         print(f"⚠️ Error setting up webhook: {str(e)}")
         # Don't raise error, just log it
 
+def handle_hook_event(event: Optional[str], payload: Dict) -> bool:
+    """
+    Invalidate the registry when GitHub reports our webhook deleted (a "meta" event).
+    Returns True if the payload was such an event.
+    """
+    if event != "meta" or payload.get("action") != "deleted":
+        return False
+    full_name = payload.get("repository", {}).get("full_name")
+    if full_name:
+        webhook_registry.invalidate(full_name, payload.get("hook_id"))
+    return True
@@ -0,0 +1,9 @@
+from types import ModuleType
+
+def get_requests() -> ModuleType:
+    """
+    The requests module, imported on first use. Only Render and GitHub API calls
+    need it, and importing it at startup would slow down every cold start.
+    """
+    import requests
+    return requests
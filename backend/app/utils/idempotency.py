@@ -0,0 +1,105 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.config import settings
+
+class IdempotencyConflictError(Exception):
+    """An idempotency key was reused for a different request."""
+
+class IdempotencyStore:
+    """
+    Runs each request key once: a duplicate arriving while the first is in flight awaits
+    its result, and one arriving within the TTL after it finished gets the stored result.
+    Failed requests are forgotten so they can be retried. A TTL of 0 only dedupes in-flight work.
+    """
+
+    def __init__(self, ttl: float = 86400, max_keys: int = 10000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}  # key -> (fingerprint, future)
+        self._completed: "OrderedDict[str, Tuple[str, Any, float]]" = OrderedDict()  # key -> (fingerprint, result, expires at), oldest first
+        self.started = 0
+        self.replayed = 0
+
+    def _expire(self, now: float):
+        while self._completed:
+            key, (_, _, expires_at) = next(iter(self._completed.items()))
+            if expires_at > now and len(self._completed) <= self.max_keys:
+                break
+            self._completed.popitem(last=False)
+
+    def join(self, key: str, fingerprint: str) -> Optional[asyncio.Future]:
+        """
+        A future for the key's existing result (in flight or stored), or None if the key is unused.
+        Raises IdempotencyConflictError if the key was used with a different fingerprint.
+        """
+        self._expire(time.monotonic())
+
+        existing = self._in_flight.get(key) or self._completed.get(key)
+        if existing is None:
+            return None
+        if existing[0] != fingerprint:
+            raise IdempotencyConflictError(f"Idempotency key {key} was already used for a different request")
+        self.replayed += 1
+        if key in self._in_flight:
+            return existing[1]
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(existing[1])
+        return future
+
+    def begin(self, key: str, fingerprint: str) -> asyncio.Future:
+        """Mark an unused key as in flight; its result must be reported with finish()"""
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting on a failure; retrieve it so asyncio doesn't warn about it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = (fingerprint, future)
+        self.started += 1
+        return future
+
+    def finish(self, key: str, result: Any = None, error: Optional[BaseException] = None):
+        """Resolve an in-flight key: store its result, or forget it after a failure so it can be retried"""
+        fingerprint, future = self._in_flight.pop(key)
+        if error is not None:
+            if isinstance(error, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(error)
+            return
+
+        future.set_result(result)
+        if self.ttl > 0:
+            self._completed[key] = (fingerprint, result, time.monotonic() + self.ttl)
+            self._expire(time.monotonic())
+
+    async def run(self, key: str, fingerprint: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Return (result, replayed): the existing result for the key if there is one,
+        otherwise the result of awaiting factory(). Raises IdempotencyConflictError
+        if the key was used with a different fingerprint.
+        """
+        existing = self.join(key, fingerprint)
+        if existing is not None:
+            return await asyncio.shield(existing), True
+
+        self.begin(key, fingerprint)
+        try:
+            result = await factory()
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result)
+        return result, False
+
+    def get_stats(self) -> Dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "stored": len(self._completed),
+            "started": self.started,
+            "replayed": self.replayed,
+            "ttl": self.ttl
+        }
+
+# Global instances
+deploy_idempotency = IdempotencyStore(ttl=settings.idempotency_key_ttl, max_keys=settings.idempotency_max_keys)
+in_flight_deployments = IdempotencyStore(ttl=0)  # Keyed by repository and environment
@@ -0,0 +1,110 @@
+import re
+from typing import Dict, List, Optional
+
+# Canonical environments in the priority order used when a prompt names several
+ENVIRONMENT_PRIORITY = ["prod", "beta", "qa", "dev"]
+
+# One alternation scanned left to right: URLs are consumed first so repo names
+# like "org/dev-tools" never count as environment keywords.
+PROMPT_PATTERN = re.compile(
+    r'(?P<url>https://github\.com/[^\s"\'<>()\[\],;]+)'
+    r'|(?P<github>github\.com)'
+    r'|\b(?:'
+    r'(?P<prod>prod|production)'
+    r'|(?P<beta>beta|staging)'
+    r'|(?P<qa>qa)'
+    r'|(?P<dev>dev|development)'
+    r'|(?P<weak_prod>live)'
+    r'|(?P<weak_qa>test|testing)'
+    r'|(?P<weak_dev>local)'
+    r'|(?P<deploy>(?:re)?deploy\w*)'
+    r'|(?P<app_type>api|backend|static\s+site|website|frontend|web\s+app(?:lication)?)'
+    r')\b',
+    re.IGNORECASE
+)
+
+# Deployment types named by the app_type keywords
+DEPLOYMENT_TYPES = {
+    "api": "api",
+    "backend": "api",
+    "static site": "static site",
+    "website": "static site",
+    "frontend": "frontend",
+    "web app": "web application",
+    "web application": "web application"
+}
+
+# Phrases in an AI reply showing it is asking for a repository or an environment
+AI_QUESTION_PATTERN = re.compile(
+    r'(?P<repo>github|\brepo(?:s|sitory|sitories)?\b|\burls?\b)'
+    r'|(?P<environment>\benvironments?\b|\bwhere\b)',
+    re.IGNORECASE
+)
+
+class PromptEntities:
+    """Repository URLs, environments, deployment type and deploy intent found in one pass over a prompt."""
+    
+    __slots__ = ("repo_urls", "environments", "weak_environments", "deployment_type", "deploy_intent", "mentions_github")
+    
+    def __init__(self):
+        self.repo_urls: List[str] = []  # Canonical URLs, first mention first
+        self.environments: List[str] = []  # Explicit keywords such as "prod" or "staging"
+        self.weak_environments: List[str] = []  # Loose synonyms such as "live" or "testing"
+        self.deployment_type: Optional[str] = None
+        self.deploy_intent = False
+        self.mentions_github = False
+    
+    @property
+    def repo_url(self) -> Optional[str]:
+        return self.repo_urls[0] if self.repo_urls else None
+    
+    @property
+    def environment(self) -> Optional[str]:
+        """Highest-priority environment named by any keyword, explicit or loose"""
+        found = set(self.environments) | set(self.weak_environments)
+        for env in ENVIRONMENT_PRIORITY:
+            if env in found:
+                return env
+        return None
+    
+    @property
+    def unambiguous_environment(self) -> Optional[str]:
+        """The environment if exactly one is named explicitly and no synonym points elsewhere"""
+        if len(self.environments) != 1 or not set(self.weak_environments) <= set(self.environments):
+            return None
+        return self.environments[0]
+
+def canonical_repo_url(url: str) -> str:
+    """Strip trailing punctuation, ".git" and "/" from a GitHub URL"""
+    return url.rstrip('.!?:').removesuffix('.git').rstrip('/')
+
+def extract_entities(text: str) -> PromptEntities:
+    """Scan a prompt once for GitHub URLs, environment keywords, deployment type and deploy intent"""
+    entities = PromptEntities()
+    for match in PROMPT_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "url":
+            url = canonical_repo_url(match.group())
+            entities.mentions_github = True
+            if url not in entities.repo_urls:
+                entities.repo_urls.append(url)
+        elif kind == "github":
+            entities.mentions_github = True
+        elif kind == "deploy":
+            entities.deploy_intent = True
+        elif kind == "app_type":
+            entities.deployment_type = entities.deployment_type or DEPLOYMENT_TYPES[" ".join(match.group().lower().split())]
+        elif kind.startswith("weak_"):
+            if kind[5:] not in entities.weak_environments:
+                entities.weak_environments.append(kind[5:])
+        elif kind not in entities.environments:
+            entities.environments.append(kind)
+    return entities
+
+def detect_ai_questions(ai_response: str) -> Dict[str, bool]:
+    """Report whether an AI reply asks for a repository URL and/or an environment"""
+    kinds = {match.lastgroup for match in AI_QUESTION_PATTERN.finditer(ai_response)}
+    return {
+        "asks_repo_url": "repo" in kinds,
+        "asks_environment": "environment" in kinds
+    }
@@ -0,0 +1,181 @@
+import math
+import time
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional
+from app.config import settings
+
+# Identity of the client whose request is being served, set by ClientIdentityMiddleware
+current_client_id: ContextVar[str] = ContextVar("current_client_id", default="anonymous")
+
+class LLMOverloadedError(Exception):
+    """Raised when an LLM call is shed because the wait queue is full or the wait timed out."""
+    
+    def __init__(self, retry_after: int):
+        super().__init__(f"AI service is busy. Please retry in {retry_after} seconds.")
+        self.retry_after = retry_after
+
+class LLMPermit:
+    """A held LLM slot. release() is idempotent so it can be called from several cleanup paths."""
+    
+    def __init__(self, controller: "LLMAdmissionController"):
+        self._controller = controller
+        self._acquired_at = time.monotonic()
+        self._released = False
+    
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(time.monotonic() - self._acquired_at)
+
+class LLMAdmissionController:
+    """
+    Concurrency limiter for LLM calls with a bounded wait queue.
+    Waiting calls are granted slots round-robin across clients, and calls that
+    cannot be queued are rejected immediately with a Retry-After estimate.
+    """
+    
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 32, max_queue_per_client: int = 4, queue_timeout: float = 10.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._queued = 0
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()  # Client rotation order
+        self._avg_hold = 1.0  # Moving average of seconds a slot is held
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+    
+    async def acquire(self, client_id: str = None) -> LLMPermit:
+        """Wait for an LLM slot, or raise LLMOverloadedError if the request must be shed"""
+        client_id = client_id or current_client_id.get()
+        
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            self.admitted += 1
+            return LLMPermit(self)
+        
+        queue = self._waiting.get(client_id)
+        if self._queued >= self.max_queue or (queue and len(queue) >= self.max_queue_per_client):
+            self.rejected += 1
+            raise LLMOverloadedError(self._retry_after())
+        
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(client_id, deque()).append(future)
+        self._queued += 1
+        
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up, so pass it on
+                LLMPermit(self).release()
+            else:
+                future.cancel()
+                self._discard(client_id, future)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise LLMOverloadedError(self._retry_after())
+            raise
+        
+        self.admitted += 1
+        return LLMPermit(self)
+    
+    @asynccontextmanager
+    async def admit(self, client_id: str = None):
+        """Hold an LLM slot for the duration of the block"""
+        permit = await self.acquire(client_id)
+        try:
+            yield permit
+        finally:
+            permit.release()
+    
+    def get_stats(self) -> Dict:
+        """Return slot usage and shedding counters"""
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "waiting_clients": len(self._waiting),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_hold_seconds": round(self._avg_hold, 3)
+        }
+    
+    def _release(self, held_for: float):
+        """Hand the slot to the next waiting client in rotation, or free it"""
+        self._avg_hold = 0.9 * self._avg_hold + 0.1 * held_for
+        
+        while self._waiting:
+            client_id, queue = next(iter(self._waiting.items()))
+            future = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._waiting.move_to_end(client_id)
+            else:
+                del self._waiting[client_id]
+            
+            if not future.done():
+                future.set_result(None)
+                return
+        
+        self._active -= 1
+    
+    def _discard(self, client_id: str, future: asyncio.Future):
+        queue = self._waiting.get(client_id)
+        if queue and future in queue:
+            queue.remove(future)
+            self._queued -= 1
+            if not queue:
+                del self._waiting[client_id]
+    
+    def _retry_after(self) -> int:
+        """Estimate seconds until the current backlog drains"""
+        return max(1, math.ceil(self._avg_hold * (self._queued / self.max_concurrency + 1)))
+
+class ClientIdentityMiddleware:
+    """
+    ASGI middleware that records the calling client: the X-Forwarded-For hop appended by the
+    outermost trusted proxy, or the peer address. Earlier hops are client-controlled and ignored.
+    """
+    
+    def __init__(self, app, trusted_proxies: Optional[int] = None):
+        self.app = app
+        self.trusted_proxies = settings.trusted_proxy_count if trusted_proxies is None else trusted_proxies
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        client_id = None
+        if self.trusted_proxies > 0:
+            hops = [
+                hop.strip()
+                for name, value in scope.get("headers", []) if name == b"x-forwarded-for"
+                for hop in value.decode("latin-1").split(",") if hop.strip()
+            ]
+            if len(hops) >= self.trusted_proxies:
+                client_id = hops[-self.trusted_proxies]
+        if not client_id and scope.get("client"):
+            client_id = scope["client"][0]
+        
+        token = current_client_id.set(client_id or "anonymous")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_client_id.reset(token)
+
+# Global instance
+llm_admission = LLMAdmissionController(
+    max_concurrency=settings.llm_max_concurrency,
+    max_queue=settings.llm_max_queue,
+    max_queue_per_client=settings.llm_max_queue_per_client,
+    queue_timeout=settings.llm_queue_timeout
+)
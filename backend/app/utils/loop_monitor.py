@@ -0,0 +1,146 @@
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+from app.config import settings
+
+class LoopStallMonitor:
+    """
+    Measures event loop lag with a heartbeat task and catches blocking calls:
+    a watchdog thread notices when the heartbeat is overdue by more than the threshold
+    and captures the stack of whatever is holding the loop at that moment.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, interval_ms: float = 50.0, max_stalls: int = 50):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.recent_stalls = deque(maxlen=max_stalls)
+        self.recent_lags = deque(maxlen=1000)  # Seconds, for percentiles
+        self.stall_count = 0
+        self.total_stall_ms = 0.0
+        self.max_stall_ms = 0.0
+        self.samples = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._last_beat = 0.0
+        self._captured: Optional[Dict] = None  # Stack captured during the stall in progress
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None and not self._heartbeat_task.done()
+
+    def start(self):
+        """Start monitoring the running event loop (call from a coroutine on that loop)"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stopped.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-stall-watchdog", daemon=True)
+        self._watchdog.start()
+        print(f"🐢 Event loop stall monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        """Stop monitoring"""
+        self._stopped.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+
+            with self._lock:
+                self._last_beat = now
+                captured, self._captured = self._captured, None
+                self.samples += 1
+                self.recent_lags.append(lag)
+                if lag >= self.threshold:
+                    self._record_stall(lag, captured)
+
+    def _record_stall(self, lag: float, captured: Optional[Dict]):
+        """Record a finished stall (caller holds the lock)"""
+        duration_ms = lag * 1000
+        self.stall_count += 1
+        self.total_stall_ms += duration_ms
+        self.max_stall_ms = max(self.max_stall_ms, duration_ms)
+
+        stall = {
+            "duration_ms": round(duration_ms, 1),
+            "timestamp": datetime.utcnow().isoformat(),
+            "task": captured["task"] if captured else None,
+            "stack": captured["stack"] if captured else []
+        }
+        self.recent_stalls.append(stall)
+
+        where = stall["stack"][-1].strip().splitlines()[0] if stall["stack"] else "unknown location"
+        print(f"🐢 Event loop blocked for {duration_ms:.0f} ms in {stall['task'] or 'a callback'} at {where}")
+
+    def _watch(self):
+        # Check at twice the threshold rate so stacks are captured while the loop is still blocked
+        while not self._stopped.wait(self.threshold / 2):
+            with self._lock:
+                overdue = time.perf_counter() - self._last_beat - self.interval
+                if overdue < self.threshold or self._captured is not None:
+                    continue
+                self._captured = self._capture()
+
+    def _capture(self) -> Dict:
+        """Capture the loop thread's stack and the task it is running"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-30:] if frame else []
+
+        task_name = None
+        current_tasks = getattr(asyncio.tasks, "_current_tasks", {})
+        task = current_tasks.get(self._loop)
+        if task is not None:
+            coro = task.get_coro()
+            task_name = f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+        return {"stack": stack, "task": task_name}
+
+    def get_stats(self) -> Dict:
+        """Return loop lag and stall statistics, with the most recent stalls first"""
+        with self._lock:
+            lags = sorted(self.recent_lags)
+            stalls = list(reversed(self.recent_stalls))
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(fraction * len(lags)))] * 1000, 2)
+
+        return {
+            "running": self.running,
+            "threshold_ms": self.threshold * 1000,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "lag_ms": {"p50": percentile(0.5), "p99": percentile(0.99), "max": round(lags[-1] * 1000, 2) if lags else None},
+            "stall_count": self.stall_count,
+            "total_stall_ms": round(self.total_stall_ms, 1),
+            "max_stall_ms": round(self.max_stall_ms, 1),
+            "recent_stalls": stalls
+        }
+
+# Global instance
+loop_monitor = LoopStallMonitor(
+    threshold_ms=settings.loop_stall_threshold_ms,
+    interval_ms=settings.loop_monitor_interval_ms
+)
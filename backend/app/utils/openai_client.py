@@ -0,0 +1,48 @@
+import os
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Optional
+from app.config import settings
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Process-wide client so every LLM call shares one connection pool
+_client: Optional["AsyncOpenAI"] = None
+_client_lock = threading.Lock()  # The client may be built by the warm-up thread and a request at once
+
+def init_openai_client() -> Optional["AsyncOpenAI"]:
+    """
+    Create the shared async OpenAI client. Returns None if no API key is configured.
+    With llm_provider set to "stub" a deterministic local model is used instead.
+    """
+    global _client
+    with _client_lock:
+        if _client is None and settings.llm_provider == "stub":
+            from app.utils.stub_llm import StubLLMClient
+            print("🧪 Using the local stub LLM")
+            _client = StubLLMClient(latency=settings.stub_llm_latency, token_latency=settings.stub_llm_token_latency)
+        elif _client is None:
+            api_key = os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                print("⚠️ OPENAI_API_KEY not found in environment variables")
+                return None
+            # openai is the heaviest import in the app, so it is only loaded when a client is needed
+            from openai import AsyncOpenAI
+            _client = AsyncOpenAI(api_key=api_key, max_retries=settings.openai_max_retries)
+        return _client
+
+def get_openai_client() -> Optional["AsyncOpenAI"]:
+    """Return the shared client, creating it on first use outside the app lifecycle"""
+    return _client or init_openai_client()
+
+async def warm_up_openai_client():
+    """Import openai and build the client in a worker thread so startup doesn't wait for it"""
+    await asyncio.to_thread(init_openai_client)
+
+async def close_openai_client():
+    """Close the shared client's connection pool"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1,250 @@
+import os
+import sys
+import hmac
+import time
+import threading
+from bisect import bisect_left
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+
+# Upper bounds of the latency buckets in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with status code counts for one route."""
+
+    __slots__ = ("buckets", "count", "total_ms", "max_ms", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.statuses = Counter()
+
+    def record(self, duration_ms: float, status: int):
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.statuses[status] += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of requests"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "buckets": {
+                (f"le_{bound}" if index < len(LATENCY_BUCKETS_MS) else "inf"): self.buckets[index]
+                for index, bound in enumerate(LATENCY_BUCKETS_MS + [None])
+            }
+        }
+
+class SamplingProfiler:
+    """
+    Samples the event loop thread's stack while profiled requests are in flight.
+    Requests share the loop, so a profile also contains whatever else ran during the request.
+    Profiles are written in collapsed-stack format (one "frame;frame;frame count" line per stack),
+    which flame graph tools read directly.
+    """
+
+    def __init__(self, enabled: bool, threshold_ms: float, interval_ms: float, output_dir: str, max_profiles: int):
+        self.enabled = enabled
+        self.threshold_ms = threshold_ms
+        self.interval = interval_ms / 1000
+        self.output_dir = output_dir
+        self.max_profiles = max_profiles
+        self.recent = deque(maxlen=max_profiles)
+        self._active: Dict[int, Tuple[int, Counter]] = {}  # token -> (thread id, stack counts)
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> int:
+        """Start sampling the calling thread for a request; returns a token for stop()"""
+        with self._lock:
+            self._next_token += 1
+            token = self._next_token
+            self._active[token] = (threading.get_ident(), Counter())
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+                self._thread.start()
+        return token
+
+    def stop(self, token: int) -> Counter:
+        """Stop sampling for a request and return its stack counts"""
+        with self._lock:
+            _, stacks = self._active.pop(token, (None, Counter()))
+        return stacks
+
+    def _sample_loop(self):
+        # Runs only while at least one request is being profiled
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                collapsed_by_thread: Dict[int, str] = {}
+                for thread_id, stacks in self._active.values():
+                    if thread_id not in collapsed_by_thread:
+                        frame = frames.get(thread_id)
+                        collapsed_by_thread[thread_id] = self._collapse(frame) if frame else ""
+                    if collapsed_by_thread[thread_id]:
+                        stacks[collapsed_by_thread[thread_id]] += 1
+
+    def _collapse(self, frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def save(self, method: str, route: str, duration_ms: float, status: int, stacks: Counter, reason: str) -> Optional[Dict]:
+        """Write a request's profile to disk and remember it, dropping the oldest beyond max_profiles"""
+        timestamp = datetime.utcnow()
+        entry = {
+            "method": method,
+            "route": route,
+            "duration_ms": round(duration_ms, 2),
+            "status": status,
+            "reason": reason,
+            "samples": sum(stacks.values()),
+            "timestamp": timestamp.isoformat(),
+            "path": None
+        }
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            slug = "".join(c if c.isalnum() else "_" for c in route).strip("_") or "root"
+            path = os.path.join(self.output_dir, f"{timestamp.strftime('%Y%m%dT%H%M%S%f')}-{method}-{slug}.collapsed")
+            with open(path, "w") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            entry["path"] = path
+        except Exception as e:
+            print(f"⚠️ Could not write request profile: {str(e)}")
+            return None
+
+        with self._lock:
+            if len(self.recent) == self.recent.maxlen:
+                oldest = self.recent[0]
+                if oldest["path"] and os.path.exists(oldest["path"]):
+                    os.remove(oldest["path"])
+            self.recent.append(entry)
+        return entry
+
+    def get_profiles(self) -> List[Dict]:
+        """Recent profiles, newest first"""
+        return list(reversed(self.recent))
+
+class RequestMetrics:
+    """Per-route latency histograms."""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], LatencyHistogram] = {}
+
+    def record(self, method: str, route: str, duration_ms: float, status: int):
+        histogram = self.routes.get((method, route))
+        if histogram is None:
+            histogram = self.routes[(method, route)] = LatencyHistogram()
+        histogram.record(duration_ms, status)
+
+    def get_stats(self) -> Dict:
+        routes = sorted(self.routes.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return {
+            "bucket_bounds_ms": LATENCY_BUCKETS_MS,
+            "routes": [{"method": method, "route": route, **histogram.to_dict()} for (method, route), histogram in routes]
+        }
+
+def route_template(scope) -> str:
+    """
+    The matched route's path template, e.g. /deploy/status/{deployment_id}, so IDs in paths
+    don't each create a histogram. Routes of included routers may only know the path after
+    their router's prefix, so the literal prefix is taken from the request path.
+    """
+    route = scope.get("route")
+    route_path = getattr(route, "path", None)
+    path_regex = getattr(route, "path_regex", None)
+    if route_path is None or path_regex is None:
+        return "unmatched"
+
+    path = scope.get("path", "")
+    start = 0
+    while start != -1:
+        if path_regex.match(path[start:]):
+            return path[:start] + route_path
+        start = path.find("/", start + 1)
+    return route_path
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware that times every HTTP request into per-route histograms and,
+    when profiling is on (or an admin asks for it with the X-Profile header),
+    saves a stack profile of requests slower than the threshold.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        forced = False
+        if settings.profiler_allow_header and settings.admin_token:
+            headers = dict(scope.get("headers", []))
+            admin_token = headers.get(b"x-admin-token", b"")
+            forced = headers.get(b"x-profile") in (b"1", b"true") and hmac.compare_digest(admin_token, settings.admin_token.encode())
+        token = request_profiler.start() if (request_profiler.enabled or forced) else None
+        status = 500
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started_at) * 1000
+            route_path = route_template(scope)
+            request_metrics.record(scope["method"], route_path, duration_ms, status)
+
+            if token is not None:
+                stacks = request_profiler.stop(token)
+                if forced or duration_ms >= request_profiler.threshold_ms:
+                    request_profiler.save(scope["method"], route_path, duration_ms, status, stacks, "requested" if forced else "slow")
+
+# Global instances
+request_metrics = RequestMetrics()
+request_profiler = SamplingProfiler(
+    enabled=settings.profiler_enabled,
+    threshold_ms=settings.profiler_slow_ms,
+    interval_ms=settings.profiler_interval_ms,
+    output_dir=settings.profiler_output_dir,
+    max_profiles=settings.profiler_max_profiles
+)
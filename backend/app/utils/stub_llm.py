@@ -0,0 +1,52 @@
+import json
+import asyncio
+from types import SimpleNamespace
+from typing import Dict, List
+
+class StubChatCompletions:
+    """Deterministic stand-in for client.chat.completions with configurable latency."""
+    
+    def __init__(self, latency: float, token_latency: float):
+        self.latency = latency
+        self.token_latency = token_latency
+    
+    async def create(self, model: str, messages: List[Dict], stream: bool = False, **kwargs):
+        await asyncio.sleep(self.latency)
+        content = self._reply(messages)
+        
+        if not stream:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        return self._stream(content)
+    
+    async def _stream(self, content: str):
+        for word in content.split(" "):
+            await asyncio.sleep(self.token_latency)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " "))])
+    
+    def _reply(self, messages: List[Dict]) -> str:
+        """Answer extraction prompts with rule-based JSON and chat prompts with canned replies"""
+        from app.utils.ai_prompt import fallback_parse
+        
+        system_prompt = messages[0]["content"] if messages else ""
+        user_message = messages[-1]["content"] if messages else ""
+        
+        if "extracts deployment information" in system_prompt:
+            return json.dumps(fallback_parse(user_message))
+        
+        info = fallback_parse(user_message)
+        if "deploy" not in user_message.lower():
+            return "Hi! I'm InfraAgent running on the local stub model. How can I help you deploy today?"
+        if info["needs_repo_url"]:
+            return "Sure! Which GitHub repository URL would you like to deploy?"
+        if info["needs_environment"]:
+            return "Great! Which environment should I deploy to: dev, qa, beta or prod?"
+        return f"Deploying {info['repo_url']} to {info['environment']}. Use the deploy form to start it."
+
+class StubLLMClient:
+    """Local model exposing the subset of the AsyncOpenAI interface used by InfraAgent."""
+    
+    def __init__(self, latency: float = 0.5, token_latency: float = 0.02):
+        self.chat = SimpleNamespace(completions=StubChatCompletions(latency, token_latency))
+    
+    async def close(self):
+        pass
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass intent matcher against the previous piecemeal keyword scans.
+Generates a labelled corpus of deployment and chat prompts, then reports throughput
+and environment accuracy for both approaches.
+
+Usage: python benchmarks/bench_intent_matcher.py [corpus_size]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.utils.intent_matcher import extract_entities
+
+REPOS = ["acme/web", "acme/dev-tools", "org/production-api", "team/qa-dashboard", "me/beta-site", "corp/devops-portal"]
+ENV_WORDS = {"dev": ["dev", "development"], "qa": ["qa"], "beta": ["beta", "staging"], "prod": ["prod", "production"]}
+TEMPLATES = [
+    "deploy https://github.com/{repo} to {env}",
+    "Please deploy my app from https://github.com/{repo} to the {env} environment.",
+    "can you redeploy https://github.com/{repo} on {env}?",
+    "ship https://github.com/{repo} to {env} after the devops review",
+    "deploy my devops service",
+    "hi, how are you?",
+    "what does a deployment to {env} involve?",
+    "deploy https://github.com/{repo}",
+    "Deploy to {env}: https://github.com/{repo}.",
+]
+
+def build_corpus(size: int, seed: int = 42):
+    """Return (prompt, expected_env, expected_repo) tuples"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        template = rng.choice(TEMPLATES)
+        env = rng.choice(list(ENV_WORDS))
+        repo = rng.choice(REPOS)
+        prompt = template.format(repo=repo, env=rng.choice(ENV_WORDS[env]))
+        corpus.append((
+            prompt,
+            env if "{env}" in template else None,
+            f"https://github.com/{repo}" if "{repo}" in template else None
+        ))
+    return corpus
+
+# Previous implementations, kept here as the comparison baseline
+LEGACY_ENV_PATTERNS = {
+    'prod': r'\b(prod|production|live)\b',
+    'beta': r'\b(beta|staging)\b',
+    'qa': r'\b(qa|test|testing)\b',
+    'dev': r'\b(dev|development|local)\b'
+}
+
+def legacy_scan(prompt: str):
+    lower = prompt.lower()
+    deploy_intent = any(phrase in lower for phrase in ["deploy", "deployment", "deploy my"])
+    # analyze_needs_information's checks, which every prompt paid for
+    mentions_github = "github.com" in lower
+    mentions_environment = any(env in lower for env in ["dev", "qa", "beta", "prod", "production", "staging"])
+    github_match = re.search(r'https://github\.com/[^\s]+', prompt)
+    repo_url = github_match.group(0) if github_match else None
+    environment = None
+    for env, pattern in LEGACY_ENV_PATTERNS.items():
+        if re.search(pattern, prompt, re.IGNORECASE):
+            environment = env
+            break
+    # extract_environment_from_prompt's separate substring scan
+    prompt_environment = None
+    for env in ["dev", "qa", "beta", "prod"]:
+        if env in lower:
+            prompt_environment = env
+            break
+    return repo_url, environment, deploy_intent
+
+def matcher_scan(prompt: str):
+    entities = extract_entities(prompt)
+    return entities.repo_url, entities.environment, entities.deploy_intent
+
+def run(name, scan, corpus):
+    start = time.perf_counter()
+    results = [scan(prompt) for prompt, _, _ in corpus]
+    elapsed = time.perf_counter() - start
+    
+    env_correct = sum(1 for (repo, env, _), (_, expected_env, _) in zip(results, corpus) if env == expected_env)
+    repo_correct = sum(1 for (repo, _, _), (_, _, expected_repo) in zip(results, corpus) if repo == expected_repo)
+    print(f"{name:<10} {len(corpus) / elapsed:>12,.0f} prompts/s   "
+          f"environment accuracy {env_correct / len(corpus):6.1%}   repo accuracy {repo_correct / len(corpus):6.1%}")
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    corpus = build_corpus(size)
+    print(f"🧪 Intent matcher benchmark over {size:,} prompts\n")
+    run("legacy", legacy_scan, corpus)
+    run("matcher", matcher_scan, corpus)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the hot paths of the backend: deployment storage at 1k/100k/1M records,
+prompt parsing, webhook signature verification, app detection and list serialization.
+Results can be saved as a baseline and later runs compared against it, flagging regressions.
+Baselines are machine-specific, so they are not committed: record one locally before changing code.
+
+Usage:
+    python benchmarks/bench_suite.py                            # run everything and print results
+    python benchmarks/bench_suite.py --save /tmp/baseline.json
+    python benchmarks/bench_suite.py --compare /tmp/baseline.json [--threshold 0.5]
+    python benchmarks/bench_suite.py --sizes 1000,100000 --only storage
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import shutil
+import statistics
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.models.deployment import DeploymentStatus, DeploymentListResponse
+from app.services.deployment_storage import DeploymentStorage
+from app.services.chat_service import analyze_needs_information
+from app.services.render_deployment import RenderDeploymentService
+from app.utils.ai_prompt import fallback_parse
+from app.routers.webhook import verify_signature
+from app.config import settings
+from bench_intent_matcher import build_corpus, matcher_scan
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+REPO_COUNT = 500
+
+def measure(fn, ops: int, repeat: int = 7, warmup: int = 1) -> dict:
+    """
+    Median time per operation in nanoseconds over several runs of fn (which performs ops operations),
+    after warmup runs, and the spread of the runs (interquartile range relative to the median).
+    A single run has no spread (None).
+    """
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    median = statistics.median(times)
+    spread = None
+    if len(times) >= 3:
+        quartiles = statistics.quantiles(times, n=4)
+        spread = (quartiles[2] - quartiles[0]) / median
+    return {"ns": median / ops * 1e9, "spread": spread}
+
+# === Storage ===
+
+def bench_storage(size: int, results: dict):
+    rng = random.Random(size)
+    storage = DeploymentStorage()
+    environments = ["dev", "qa", "beta", "prod"]
+
+    def create():
+        for i in range(size):
+            storage.create_deployment(f"https://github.com/acme/app{i % REPO_COUNT}", environments[i % 4], "deploy it")
+
+    # Building the storage is itself the create benchmark, so it runs once
+    results[f"storage/create/{size}"] = measure(create, size, repeat=1, warmup=0)
+
+    ids = list(storage.deployments)
+    sample_ids = [rng.choice(ids) for _ in range(10_000)]
+    repo = "https://github.com/acme/app7"
+    light_repeat = 5 if size < 1_000_000 else 1
+
+    results[f"storage/get_deployment/{size}"] = measure(
+        lambda: [storage.get_deployment(deployment_id) for deployment_id in sample_ids], len(sample_ids))
+    results[f"storage/update_status/{size}"] = measure(
+        lambda: [storage.update_deployment_status(deployment_id, DeploymentStatus.in_progress) for deployment_id in sample_ids], len(sample_ids))
+    results[f"storage/add_build_log/{size}"] = measure(
+        lambda: [storage.add_build_log(deployment_id, "info", "🔨 Building application", "building") for deployment_id in sample_ids], len(sample_ids))
+    results[f"storage/get_all_deployments/{size}"] = measure(
+        lambda: storage.get_all_deployments(50), 1, repeat=light_repeat)
+    results[f"storage/get_deployments_by_repo/{size}"] = measure(
+        lambda: storage.get_deployments_by_repo(repo), 1, repeat=light_repeat)
+    results[f"storage/get_latest_deployment_by_repo/{size}"] = measure(
+        lambda: storage.get_latest_deployment_by_repo(repo), 1, repeat=light_repeat)
+    results[f"storage/search_build_logs/{size}"] = measure(
+        lambda: storage.search_build_logs("building application", limit=100), 1, repeat=light_repeat)
+
+# === Parsing ===
+
+def bench_parsing(results: dict):
+    corpus = [prompt for prompt, _, _ in build_corpus(20_000)]
+    results["parsing/fallback_parse"] = measure(lambda: [fallback_parse(prompt) for prompt in corpus], len(corpus))
+    results["parsing/analyze_needs_information"] = measure(
+        lambda: [analyze_needs_information(prompt, "") for prompt in corpus], len(corpus))
+    results["parsing/extract_entities"] = measure(lambda: [matcher_scan(prompt) for prompt in corpus], len(corpus))
+
+# === Webhook verification ===
+
+def bench_webhook(results: dict):
+    import hmac
+    import hashlib
+
+    for label, size in (("1KB", 1024), ("1MB", 1024 ** 2), ("10MB", 10 * 1024 ** 2)):
+        payload = os.urandom(size)
+        signature = "sha256=" + hmac.new(settings.webhook_secret.encode(), payload, hashlib.sha256).hexdigest()
+        assert verify_signature(payload, signature)
+        ops = max(1, (10 * 1024 ** 2) // size)
+        results[f"webhook/verify_signature/{label}"] = measure(lambda: [verify_signature(payload, signature) for _ in range(ops)], ops)
+
+# === App detection ===
+
+def _fixture_repo(root: str, files: dict) -> str:
+    repo_path = tempfile.mkdtemp(dir=root)
+    for name, content in files.items():
+        path = os.path.join(repo_path, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+    return repo_path
+
+def bench_detection(results: dict):
+    service = RenderDeploymentService()
+    vendored = {f"node_modules/pkg{i}/package.json": "{}" for i in range(2000)}
+    root = tempfile.mkdtemp(prefix="bench-repos-")
+    try:
+        fixtures = {
+            "single": _fixture_repo(root, {"requirements.txt": "fastapi\n", "main.py": "app = FastAPI()\n"}),
+            "monorepo": _fixture_repo(root, {
+                "backend/requirements.txt": "fastapi\n",
+                "frontend/package.json": json.dumps({"dependencies": {"react": "18"}}),
+                "services/worker/Dockerfile": "FROM python:3.11\n",
+                "README.md": "# monorepo\n"
+            }),
+            "vendored": _fixture_repo(root, {"web/package.json": "{}", **vendored})
+        }
+        for name, repo_path in fixtures.items():
+            results[f"detection/detect_app_type/{name}"] = measure(lambda: [service._detect_app_type(repo_path) for _ in range(20)], 20)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+# === Serialization ===
+
+def bench_serialization(results: dict):
+    storage = DeploymentStorage()
+    for i in range(1000):
+        deployment_id = storage.create_deployment(f"https://github.com/acme/app{i}", "prod", "deploy it")
+        for step in ("cloning", "building", "deploying", "completed"):
+            storage.add_build_log(deployment_id, "info", f"Step {step} for deployment {i}", step)
+
+    for count in (50, 1000):
+        deployments = [storage.with_build_logs(d) for d in storage.get_all_deployments(count)]
+
+        def serialize():
+            response = DeploymentListResponse(deployments=deployments, total=len(deployments))
+            return response.model_dump_json() if hasattr(response, "model_dump_json") else response.json()
+
+        results[f"serialization/deployment_list/{count}"] = measure(lambda: [serialize() for _ in range(10)], 10)
+
+# === Runner ===
+
+def run(sizes, only=None) -> dict:
+    results = {}
+    groups = [
+        ("storage", lambda: [bench_storage(size, results) for size in sizes]),
+        ("parsing", lambda: bench_parsing(results)),
+        ("webhook", lambda: bench_webhook(results)),
+        ("detection", lambda: bench_detection(results)),
+        ("serialization", lambda: bench_serialization(results)),
+    ]
+    for name, group in groups:
+        if only and name not in only:
+            continue
+        start = time.perf_counter()
+        group()
+        print(f"  ✓ {name} ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+    return results
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:8.2f} {unit}"
+    return f"{ns:8.0f} ns"
+
+def print_results(results: dict):
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        spread = f"  ±{result['spread'] / 2:.0%}" if result["spread"] is not None else ""
+        print(f"{name:<{width}}  {format_ns(result['ns'])}/op{spread}")
+
+def allowed_change(threshold: float, old: dict, new: dict) -> float:
+    """
+    Slowdown tolerated for one benchmark: the global threshold, widened to three times the noise
+    seen in either run. Single-run benchmarks (no measured noise) get twice the threshold.
+    """
+    spreads = [result["spread"] for result in (old, new) if result.get("spread") is not None]
+    if not spreads:
+        return 2 * threshold
+    return max(threshold, 3 * max(spreads))
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print each benchmark against the baseline; returns True if any regressed beyond its allowed change"""
+    regressed = False
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  {'baseline':>14}  {'current':>14}  change   allowed")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<{width}}  {'—':>14}  {format_ns(result['ns'])}/op  (new)")
+            continue
+        change = result["ns"] / old["ns"] - 1
+        allowed = allowed_change(threshold, old, result)
+        flag = ""
+        if change > allowed:
+            flag = "  ❌ REGRESSION"
+            regressed = True
+        elif change < -allowed:
+            flag = "  ✅ faster"
+        print(f"{name:<{width}}  {format_ns(old['ns'])}/op  {format_ns(result['ns'])}/op  {change:+7.1%}  {allowed:6.0%}{flag}")
+    return regressed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help="Storage sizes, comma separated")
+    parser.add_argument("--only", default=None, help="Benchmark groups to run, comma separated (storage, parsing, webhook, detection, serialization)")
+    parser.add_argument("--save", metavar="PATH", help="Save results as a baseline file")
+    parser.add_argument("--compare", metavar="PATH", help="Compare results with a baseline file")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Relative slowdown that counts as a regression, widened for noisy benchmarks (default 0.5)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    only = set(args.only.split(",")) if args.only else None
+
+    print(f"🧪 Running benchmarks (storage sizes: {', '.join(f'{size:,}' for size in sizes)})\n", file=sys.stderr)
+    results = run(sizes, only)
+    print()
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            print(f"\n💥 Benchmarks regressed beyond their allowed change against {args.compare}")
+            sys.exit(1)
+        print(f"\n✨ No regressions beyond the allowed change against {args.compare}")
+    else:
+        print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "created_at": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": {
+                    name: {"ns": round(result["ns"], 1), "spread": None if result["spread"] is None else round(result["spread"], 3)}
+                    for name, result in results.items()
+                }
+            }, f, indent=2)
+        print(f"\n💾 Saved baseline to {args.save}")
@@ -32,8 +32,10 @@ const ChatInterface = () => {
     setInputMessage('');
     setIsLoading(true);
 
+    const aiMessageId = Date.now() + 1;
+
     try {
-      const response = await fetch(`${API_BASE}/chat/`, {
+      const response = await fetch(`${API_BASE}/chat/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -44,32 +46,73 @@ const ChatInterface = () => {
         })
       });
 
-      const data = await response.json();
-
       if (!response.ok) {
+        const data = await response.json();
         throw new Error(data.detail || 'Failed to send message');
       }
 
-      // Update conversation ID if this is the first message
-      if (!conversationId) {
-        setConversationId(data.conversation_id);
-      }
-
-      const aiMessage = {
-        id: Date.now() + 1,
-        type: 'ai',
-        content: data.message,
-        timestamp: new Date(),
-        needsInput: data.needs_input,
-        inputType: data.input_type,
-        suggestions: data.suggestions
+      // Show the AI message as soon as the first token arrives
+      const handleEvent = (event, data) => {
+        if (event === 'start') {
+          // Update conversation ID if this is the first message
+          if (!conversationId) {
+            setConversationId(data.conversation_id);
+          }
+        } else if (event === 'token') {
+          setIsLoading(false);
+          setMessages(prev => {
+            if (prev.some(m => m.id === aiMessageId)) {
+              return prev.map(m => m.id === aiMessageId ? { ...m, content: m.content + data.content } : m);
+            }
+            return [...prev, { id: aiMessageId, type: 'ai', content: data.content, timestamp: new Date() }];
+          });
+        } else if (event === 'done') {
+          setMessages(prev => {
+            const aiMessage = {
+              id: aiMessageId,
+              type: 'ai',
+              content: data.message,
+              timestamp: new Date(),
+              needsInput: data.needs_input,
+              inputType: data.input_type,
+              suggestions: data.suggestions,
+              slots: data.slots
+            };
+            if (prev.some(m => m.id === aiMessageId)) {
+              return prev.map(m => m.id === aiMessageId ? aiMessage : m);
+            }
+            return [...prev, aiMessage];
+          });
+        }
       };
 
-      setMessages(prev => [...prev, aiMessage]);
+      // Parse the Server-Sent Events stream
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+
+        for (const rawEvent of events) {
+          let event = 'message';
+          let data = '';
+          for (const line of rawEvent.split('\n')) {
+            if (line.startsWith('event: ')) event = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+          }
+          if (data) handleEvent(event, JSON.parse(data));
+        }
+      }
 
     } catch (error) {
       const errorMessage = {
-        id: Date.now() + 1,
+        id: aiMessageId + 1,
         type: 'ai',
         content: `Sorry, I'm having trouble right now: ${error.message}`,
         timestamp: new Date(),
@@ -86,6 +129,44 @@ const ChatInterface = () => {
     sendMessage(inputMessage);
   };
 
+  // Deploy straight from the details collected in this conversation
+  const deployFromConversation = async () => {
+    setIsLoading(true);
+
+    try {
+      const response = await fetch(`${API_BASE}/deploy/from-conversation`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ conversation_id: conversationId })
+      });
+
+      const data = await response.json();
+
+      if (!response.ok) {
+        throw new Error(data.detail || 'Failed to start deployment');
+      }
+
+      setMessages(prev => [...prev, {
+        id: Date.now(),
+        type: 'ai',
+        content: data.deployment_id ? `${data.message} (deployment ${data.deployment_id})` : data.message,
+        timestamp: new Date()
+      }]);
+    } catch (error) {
+      setMessages(prev => [...prev, {
+        id: Date.now(),
+        type: 'ai',
+        content: `Sorry, I couldn't start the deployment: ${error.message}`,
+        timestamp: new Date(),
+        isError: true
+      }]);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
   const handleSuggestionClick = (suggestion) => {
     setInputMessage(suggestion);
   };
@@ -132,6 +213,21 @@ const ChatInterface = () => {
                 {message.content}
               </div>
               
+              {message.slots && message.slots.repo_url && message.slots.environment &&
+                message.id === messages[messages.length - 1].id && (
+                <div className="suggestions">
+                  <div className="suggestion-buttons">
+                    <button
+                      className="suggestion-btn"
+                      onClick={deployFromConversation}
+                      disabled={isLoading}
+                    >
+                      🚀 Deploy {message.slots.repo_url} to {message.slots.environment}
+                    </button>
+                  </div>
+                </div>
+              )}
+
               {message.suggestions && message.suggestions.length > 0 && (
                 <div className="suggestions">
                   <p className="suggestion-label">💡 Quick suggestions:</p>
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import './DeployForm.css';
 
 const DeployForm = () => {
@@ -9,6 +9,8 @@ const DeployForm = () => {
   const [response, setResponse] = useState(null);
   const [error, setError] = useState(null);
   const [missingFields, setMissingFields] = useState([]);
+  // One key per prompt, so double-clicks and retries don't start duplicate deployments
+  const idempotency = useRef({ prompt: null, key: null });
 
   const API_BASE = process.env.REACT_APP_API_URL || 'https://infraagent.onrender.com';
 
@@ -44,11 +46,16 @@ const DeployForm = () => {
     setError(null);
     setResponse(null);
 
+    if (idempotency.current.prompt !== formData.prompt) {
+      idempotency.current = { prompt: formData.prompt, key: crypto.randomUUID() };
+    }
+
     try {
       const response = await fetch(`${API_BASE}/deploy/`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Idempotency-Key': idempotency.current.key,
         },
         body: JSON.stringify({
           prompt: formData.prompt
@@ -66,6 +73,7 @@ const DeployForm = () => {
       // Only reset form if deployment was successful
       if (data.status === 'success') {
         setFormData({ prompt: '' });
+        idempotency.current = { prompt: null, key: null };
       }
       
     } catch (err) {
@@ -349,7 +349,10 @@ const DeploymentDashboard = () => {
                           {log.level.toUpperCase()}
                         </span>
                       </div>
-                      <div className="log-message">{log.message}</div>
+                      <div className="log-message">
+                        {log.message}
+                        {log.count > 1 && <span className="log-count"> ×{log.count}</span>}
+                      </div>
                     </div>
                   ))
                 )}
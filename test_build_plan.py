@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test the lockfile-aware build plan generator against small fixture repositories.
+Run this to check that each package manager gets reproducible install commands
+and that web entrypoints get the right server command.
+"""
+
+import sys
+import os
+import json
+import atexit
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+FIXTURE_ROOT = tempfile.TemporaryDirectory(prefix="build-plan-")
+atexit.register(FIXTURE_ROOT.cleanup)
+
+def _make_repo(files: dict) -> str:
+    """Write a fixture repository to a directory that is removed when the tests finish"""
+    repo_path = tempfile.mkdtemp(dir=FIXTURE_ROOT.name)
+    for name, content in files.items():
+        path = os.path.join(repo_path, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content if isinstance(content, str) else json.dumps(content))
+    return repo_path
+
+def _plan(files: dict, app_type: str) -> dict:
+    from app.services.build_plan import generate_build_plan
+    return generate_build_plan(_make_repo(files), app_type)
+
+def _env(plan: dict) -> dict:
+    return {env_var["key"]: env_var["value"] for env_var in plan["env_vars"]}
+
+REACT_PACKAGE = {"dependencies": {"react": "^18.0.0"}, "scripts": {"build": "react-scripts build", "start": "serve -s build"}}
+
+def test_node_lockfiles():
+    """Each Node lockfile should select its package manager's frozen install."""
+    npm = _plan({"package.json": REACT_PACKAGE, "package-lock.json": "{}", ".nvmrc": "v20.11.0\n"}, "react")
+    assert npm["build_command"] == "npm ci --prefer-offline --no-audit --no-fund && npm run build"
+    assert npm["start_command"] == "npm start"
+    assert _env(npm)["NODE_VERSION"] == "20.11.0"
+
+    yarn = _plan({"package.json": REACT_PACKAGE, "yarn.lock": ""}, "react")
+    assert yarn["build_command"] == "yarn install --frozen-lockfile --prefer-offline && yarn run build"
+    assert yarn["start_command"] == "yarn start"
+
+    berry = _plan({"package.json": REACT_PACKAGE, "yarn.lock": "", ".yarnrc.yml": ""}, "react")
+    assert berry["build_command"].startswith("corepack enable && yarn install --immutable")
+
+    pnpm = _plan({"package.json": {"main": "server.js", "engines": {"node": "18.x"}}, "pnpm-lock.yaml": ""}, "nodejs")
+    assert pnpm["build_command"] == "corepack enable && pnpm install --frozen-lockfile --prefer-offline"
+    assert pnpm["start_command"] == "node server.js"
+    assert _env(pnpm)["NODE_VERSION"] == "18.x"
+
+    unlocked = _plan({"package.json": {"scripts": {"start": "node index.js"}}}, "nodejs")
+    assert unlocked["build_command"] == "npm install"
+    print("✅ Node lockfiles produce frozen installs")
+
+def test_python_lockfiles():
+    """Each Python lockfile should install without re-resolving dependencies."""
+    fastapi_main = "from fastapi import FastAPI\n\napp = FastAPI()\n"
+
+    uv_lock = '[[package]]\nname = "fastapi"\n\n[[package]]\nname = "uvicorn"\n'
+    uv = _plan({"pyproject.toml": "", "uv.lock": uv_lock, "main.py": fastapi_main}, "python")
+    assert uv["build_command"] == "pip install uv && uv sync --frozen --no-dev"
+    assert uv["start_command"] == "uv run --frozen uvicorn main:app --host 0.0.0.0 --port $PORT"
+
+    poetry_project = '[tool.poetry.dependencies]\npython = "^3.11"\nfastapi = "^0.110"\nuvicorn = {extras = ["standard"], version = "^0.29"}\n'
+    poetry = _plan({"pyproject.toml": poetry_project, "poetry.lock": "", "app/main.py": fastapi_main, ".python-version": "3.11.6\n"}, "python")
+    assert "poetry install --no-root --only main" in poetry["build_command"]
+    assert poetry["start_command"] == "uvicorn app.main:app --host 0.0.0.0 --port $PORT"
+    assert _env(poetry)["PYTHON_VERSION"] == "3.11.6"
+
+    pipenv_lock = {"default": {"flask": {"version": "==3.0.0"}, "gunicorn": {"version": "==21.2.0"}}}
+    pipenv = _plan({"Pipfile": "", "Pipfile.lock": pipenv_lock, "wsgi.py": "from flask import Flask\nserver = Flask(__name__)\n"}, "python")
+    assert pipenv["build_command"] == "pip install pipenv && pipenv install --deploy --system"
+    assert pipenv["start_command"] == "gunicorn wsgi:server --bind 0.0.0.0:$PORT"
+
+    pip = _plan({"requirements.txt": "flask\n", "app.py": "print('hi')\n", "runtime.txt": "python-3.10.13\n"}, "python")
+    assert pip["build_command"] == "pip install --prefer-binary -r requirements.txt"
+    assert pip["start_command"] == "python app.py"
+    assert _env(pip)["PYTHON_VERSION"] == "3.10.13"
+    print("✅ Python lockfiles produce reproducible installs")
+
+def test_start_command_detection():
+    """Django projects and Procfiles should set the start command."""
+    django = _plan({"requirements.txt": "django\ngunicorn==21.2.0\n", "manage.py": "", "mysite/wsgi.py": "", "mysite/__init__.py": ""}, "python")
+    assert django["start_command"] == "gunicorn mysite.wsgi:application --bind 0.0.0.0:$PORT"
+
+    pep621 = _plan({"pyproject.toml": '[project]\ndependencies = ["fastapi>=0.110", "uvicorn[standard]>=0.29"]\n', "main.py": "app = FastAPI()\n"}, "python")
+    assert pep621["start_command"] == "uvicorn main:app --host 0.0.0.0 --port $PORT"
+
+    procfile = _plan({"requirements.txt": "", "main.py": "app = FastAPI()\n", "Procfile": "web: hypercorn main:app\n"}, "python")
+    assert procfile["start_command"] == "hypercorn main:app"
+    print("✅ Start commands detected from entrypoints and Procfiles")
+
+def test_server_must_be_installed():
+    """A server command is only used when the repository installs that server."""
+    flask_only = _plan({"requirements.txt": "flask\n", "app.py": "from flask import Flask\napp = Flask(__name__)\n"}, "python")
+    assert flask_only["build_command"] == "pip install --prefer-binary -r requirements.txt"
+    assert flask_only["start_command"] == "python app.py"
+
+    fastapi_only = _plan({"requirements.txt": "fastapi\n# uvicorn\n", "main.py": "app = FastAPI()\n"}, "python")
+    assert fastapi_only["start_command"] == "python main.py"
+
+    django_only = _plan({"requirements.txt": "django\n", "manage.py": "", "mysite/wsgi.py": ""}, "python")
+    assert not django_only["start_command"].startswith("gunicorn")
+
+    with_gunicorn = _plan({"requirements.txt": "Flask==3.0.0\ngunicorn>=21 ; sys_platform != 'win32'\n", "app.py": "app = Flask(__name__)\n"}, "python")
+    assert with_gunicorn["start_command"] == "gunicorn app:app --bind 0.0.0.0:$PORT"
+    print("✅ Servers used only when installed")
+
+def test_service_config_uses_plan():
+    """The Render service config should take commands and env vars from the plan."""
+    from app.services.render_deployment import RenderDeploymentService
+
+    service = RenderDeploymentService()
+    plan = _plan({"poetry.lock": "", "pyproject.toml": "", ".python-version": "3.12"}, "python")
+    config = service._get_service_config("python", "qa", "https://github.com/a/b", plan)
+    assert config["build_command"] == plan["build_command"]
+    env = {env_var["key"]: env_var["value"] for env_var in config["env_vars"]}
+    assert env == {"PYTHON_VERSION": "3.12", "ENVIRONMENT": "qa", "REPO_URL": "https://github.com/a/b"}
+
+    node_plan = _plan({"package.json": {"main": "server.js", "engines": {"node": "18.x"}}, "package-lock.json": "{}"}, "nodejs")
+    node = service._get_service_config("nodejs", "dev", "https://github.com/a/b", node_plan)
+    assert node["env"] == "node"
+    assert node["build_command"] == "npm ci --prefer-offline --no-audit --no-fund"
+    assert node["start_command"] == "node server.js"
+    env = {env_var["key"]: env_var["value"] for env_var in node["env_vars"]}
+    assert env == {"NODE_ENV": "dev", "REPO_URL": "https://github.com/a/b", "NODE_VERSION": "18.x"}
+    assert service._get_service_config("nodejs", "dev", "https://github.com/a/b")["env"] == "node"
+
+    assert _plan({"Dockerfile": ""}, "docker") is None
+    assert service._get_service_config("python", "qa", "https://github.com/a/b")["build_command"] == "pip install -r requirements.txt"
+    print("✅ Service config merges the build plan")
+
+if __name__ == "__main__":
+    print("🧪 Testing build plan generation...\n")
+
+    test_node_lockfiles()
+    test_python_lockfiles()
+    test_start_command_detection()
+    test_server_must_be_installed()
+    test_service_config_uses_plan()
+    print("\n✨ All build plan tests passed!")
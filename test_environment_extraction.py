@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Test environment extraction from deployment prompts
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from app.services.deployment_utils import extract_environment_from_prompt
+
+def test_explicit_keywords_in_legacy_order():
+    """The first of dev, qa, beta, prod named in the prompt wins"""
+    assert extract_environment_from_prompt("deploy dev and prod") == "dev"
+    assert extract_environment_from_prompt("deploy to prod after qa signs off") == "qa"
+    assert extract_environment_from_prompt("Deploy to PRODUCTION") == "prod"
+    assert extract_environment_from_prompt("deploy to development") == "dev"
+    print("✅ Explicit environments resolve dev > qa > beta > prod")
+
+def test_word_boundaries_and_synonyms():
+    """Keywords must be whole words outside repository URLs; loose synonyms don't count"""
+    # Previously substring matches: "devops" and the repo name both read as dev
+    assert extract_environment_from_prompt("deploy my devops service") is None
+    assert extract_environment_from_prompt("deploy https://github.com/acme/dev-tools to beta") == "beta"
+    # "staging" is now an explicit beta keyword
+    assert extract_environment_from_prompt("deploy to staging") == "beta"
+    assert extract_environment_from_prompt("run the test suite locally") is None
+    assert extract_environment_from_prompt("deploy it live") is None
+    print("✅ Whole-word keywords only, URLs and loose synonyms ignored")
+
+if __name__ == "__main__":
+    test_explicit_keywords_in_legacy_order()
+    test_word_boundaries_and_synonyms()
+    print("🎉 Environment extraction tests passed!")
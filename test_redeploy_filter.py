@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test that the redeploy filter only treats a commit as deployed once its build is live.
+Run this to check that a failed build does not cause later pushes or redeliveries
+of the same commit to be skipped.
+"""
+
+import sys
+import os
+import hmac
+import json
+import time
+import hashlib
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+def _push(sha: str) -> dict:
+    return {
+        "repository": {"full_name": "acme/shop"},
+        "head_commit": {"id": sha, "message": "Fix checkout"},
+        "commits": [{"id": sha, "added": [], "modified": ["app/main.py"], "removed": []}]
+    }
+
+def _signed(payload: dict) -> dict:
+    """Request arguments for a webhook delivery signed like GitHub does"""
+    from app.config import settings
+
+    body = json.dumps(payload).encode()
+    signature = hmac.new(settings.webhook_secret.encode(), msg=body, digestmod=hashlib.sha256).hexdigest()
+    return {
+        "content": body,
+        "headers": {"Content-Type": "application/json", "X-Hub-Signature-256": f"sha256={signature}", "X-GitHub-Event": "push"}
+    }
+
+def test_filter_states():
+    """A triggered commit is in progress until it goes live or fails."""
+    from app.services.redeploy_filter import RedeployFilter
+
+    redeploy_filter = RedeployFilter(ignore_paths=["*.md"], path_rules={})
+    commits = _push("abc123")["commits"]
+
+    redeploy_filter.record_trigger("srv-1", "abc123")
+    assert redeploy_filter.check("acme/shop", "srv-1", "abc123", commits) == "already_building"
+
+    redeploy_filter.mark_failed("srv-1", "abc123")
+    assert redeploy_filter.check("acme/shop", "srv-1", "abc123", commits) is None
+
+    redeploy_filter.record_trigger("srv-1", "abc123")
+    redeploy_filter.mark_deployed("srv-1", "abc123")
+    assert redeploy_filter.check("acme/shop", "srv-1", "abc123", commits) == "already_deployed"
+    assert redeploy_filter.get_stats()["building_services"] == 0
+    print("✅ Commits count as deployed only once live")
+
+def test_failed_build_then_redelivery():
+    """A webhook redelivery after a failed build should trigger a new build."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.deployment_storage import deployment_storage
+    from app.services.redeploy_filter import redeploy_filter
+    from app.services.render_deployment import render_deployment_service
+
+    deployment_id = deployment_storage.create_deployment("https://github.com/acme/shop", "dev", "deploy shop")
+    deployment_storage.update_render_service_id(deployment_id, "srv-shop")
+    render_deployment_service.manual_deploy_services.add("srv-shop")
+
+    triggered = []
+    build_outcomes = ["failed", "live"]
+
+    async def fake_trigger(service_id, commit_id):
+        triggered.append(commit_id)
+        return f"dep-{len(triggered)}"
+
+    async def fake_wait(service_id, render_deploy_id, our_deployment_id, duration_key=("", "", "")):
+        if build_outcomes.pop(0) == "failed":
+            raise Exception("Deployment failed with status: failed")
+        redeploy_filter.mark_deployed(service_id, triggered[-1])
+        return "https://shop.onrender.com"
+
+    render_deployment_service.trigger_redeploy = fake_trigger
+    render_deployment_service._wait_for_deployment = fake_wait
+    try:
+        with TestClient(app) as client:
+            unsigned = client.post("/deploy/webhook/github", json=_push("def456"))
+            assert unsigned.status_code == 403, unsigned.text
+            assert triggered == []
+
+            first = client.post("/deploy/webhook/github", **_signed(_push("def456"))).json()
+            assert first["message"] == "Redeployment triggered successfully", first
+            time.sleep(0.2)  # Let the background watcher see the failed build
+
+            redelivery = client.post("/deploy/webhook/github", **_signed(_push("def456"))).json()
+            assert redelivery["message"] == "Redeployment triggered successfully", redelivery
+            time.sleep(0.2)
+
+            after_live = client.post("/deploy/webhook/github", **_signed(_push("def456"))).json()
+            assert after_live == {"message": "Redeployment skipped", "reason": "already_deployed"}, after_live
+    finally:
+        del render_deployment_service.trigger_redeploy
+        del render_deployment_service._wait_for_deployment
+
+    assert triggered == ["def456", "def456"]
+    print("✅ Redelivery after a failed build is deployed again")
+
+def test_hook_deletion_requires_signature():
+    """Only a signed "meta" event may drop a repository from the webhook registry."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.config import settings
+    from app.utils.github import webhook_registry
+
+    deleted = {"action": "deleted", "hook_id": 7, "repository": {"full_name": "acme/shop"}}
+    webhook_registry.confirm("acme/shop", settings.webhook_url, 7)
+    try:
+        with TestClient(app) as client:
+            forged = client.post("/deploy/webhook/github", json=deleted, headers={"X-GitHub-Event": "meta"})
+            assert forged.status_code == 403, forged.text
+            assert webhook_registry.is_registered("acme/shop", settings.webhook_url)
+
+            signed = _signed(deleted)
+            signed["headers"]["X-GitHub-Event"] = "meta"
+            assert client.post("/deploy/webhook/github", **signed).json() == {"message": "Webhook deletion recorded"}
+            assert not webhook_registry.is_registered("acme/shop", settings.webhook_url)
+    finally:
+        webhook_registry.invalidate("acme/shop")
+
+    print("✅ Unsigned hook deletions are rejected")
+
+if __name__ == "__main__":
+    print("🧪 Testing redeploy filter...\n")
+
+    test_filter_states()
+    test_failed_build_then_redelivery()
+    test_hook_deletion_requires_signature()
+    print("\n✨ All redeploy filter tests passed!")
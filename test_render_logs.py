@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test incremental ingestion of Render build output against a local fake logs endpoint.
+Run this to check that each poll only adds new lines and that output is capped.
+"""
+
+import sys
+import os
+import json
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+# Lines the fake provider has "produced" so far; tests append to this between polls
+FAKE_LOGS = []
+PAGE_REQUESTS = []
+# Deploy returned by the status endpoint, for tests that wait on a deploy
+FAKE_DEPLOY = {"id": "dep-1", "status": "live", "createdAt": "2026-01-01T00:00:00Z"}
+
+def _log_line(n: int, timestamp: str, level: str = "info") -> dict:
+    return {
+        "id": f"log-{n}",
+        "timestamp": timestamp,
+        "message": f"build line {n}",
+        "labels": [{"name": "level", "value": level}, {"name": "type", "value": "build"}]
+    }
+
+class FakeRenderLogsHandler(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for GET /v1/logs (forward direction, inclusive startTime, paginated),
+    plus the deploy status and service endpoints
+    """
+
+    def _send_json(self, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == f"/v1/services/srv-1/deploys/{FAKE_DEPLOY['id']}":
+            return self._send_json(FAKE_DEPLOY)
+        if url.path == "/v1/services/srv-1":
+            return self._send_json({"service": {"url": "https://b.onrender.com"}})
+
+        PAGE_REQUESTS.append(params)
+        if url.path != "/v1/logs" or "ownerId" not in params:
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        limit = int(params.get("limit", 20))
+        start_time = params.get("startTime")
+        matching = [line for line in FAKE_LOGS if start_time is None or line["timestamp"] >= start_time]
+        page = matching[:limit]
+        has_more = len(matching) > limit
+
+        body = {"logs": page, "hasMore": has_more}
+        if has_more:
+            body["nextStartTime"] = matching[limit]["timestamp"]
+        self._send_json(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def _start_fake_server() -> HTTPServer:
+    server = HTTPServer(("127.0.0.1", 0), FakeRenderLogsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _make_service(server: HTTPServer):
+    from app.services.render_deployment import RenderDeploymentService
+    service = RenderDeploymentService()
+    service.render_api_base = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    service.render_owner_id = "tea-test"
+    service.build_log_page_size = 3
+    return service
+
+def _provider_messages(deployment_id: str):
+    from app.services.deployment_storage import deployment_storage
+    return [log.message for log in deployment_storage.get_build_logs(deployment_id) if log.step == "build_output"]
+
+def test_incremental_ingestion():
+    """Each poll should add only lines produced since the previous poll, in order."""
+    from app.services.render_deployment import BuildLogCursor
+    from app.services.deployment_storage import deployment_storage
+
+    server = _start_fake_server()
+    try:
+        service = _make_service(server)
+        deployment_id = deployment_storage.create_deployment("https://github.com/a/b", "dev", "test")
+        cursor = BuildLogCursor()
+
+        # Several lines share a timestamp across the page boundary
+        FAKE_LOGS[:] = [_log_line(n, f"2026-01-01T00:00:0{min(n, 5)}Z") for n in range(1, 8)]
+        asyncio.run(service._ingest_build_logs("srv-1", deployment_id, cursor))
+        assert _provider_messages(deployment_id) == [f"build line {n}" for n in range(1, 8)]
+
+        # Nothing new: a poll must not duplicate lines
+        asyncio.run(service._ingest_build_logs("srv-1", deployment_id, cursor))
+        assert len(_provider_messages(deployment_id)) == 7
+
+        # New output, including an error line
+        FAKE_LOGS.append(_log_line(8, "2026-01-01T00:00:06Z"))
+        FAKE_LOGS.append(_log_line(9, "2026-01-01T00:00:09Z", level="error"))
+        asyncio.run(service._ingest_build_logs("srv-1", deployment_id, cursor))
+        assert _provider_messages(deployment_id) == [f"build line {n}" for n in range(1, 10)]
+        assert deployment_storage.get_build_logs(deployment_id)[-1].level == "error"
+        assert PAGE_REQUESTS[-1]["startTime"] == "2026-01-01T00:00:06Z"
+        print("✅ Build output ingested incrementally without duplicates")
+    finally:
+        server.shutdown()
+
+def test_ingestion_is_capped():
+    """Ingestion should stop, with a single note, once the line cap is reached."""
+    from app.services.render_deployment import BuildLogCursor
+    from app.services.deployment_storage import deployment_storage
+
+    server = _start_fake_server()
+    try:
+        service = _make_service(server)
+        service.build_log_max_lines = 5
+        deployment_id = deployment_storage.create_deployment("https://github.com/a/b", "dev", "test")
+        cursor = BuildLogCursor()
+
+        FAKE_LOGS[:] = [_log_line(n, f"2026-01-01T00:00:{n:02d}Z") for n in range(1, 20)]
+        asyncio.run(service._ingest_build_logs("srv-1", deployment_id, cursor))
+        asyncio.run(service._ingest_build_logs("srv-1", deployment_id, cursor))
+
+        messages = _provider_messages(deployment_id)
+        assert messages[:5] == [f"build line {n}" for n in range(1, 6)]
+        assert len(messages) == 6 and "truncated" in messages[-1]
+        assert cursor.truncated
+        print("✅ Build output capped per deployment")
+    finally:
+        server.shutdown()
+
+def test_ingestion_starts_at_deploy():
+    """Output of earlier builds on a reused service should not reach the deployment's logs."""
+    from app.services.deployment_storage import deployment_storage
+
+    server = _start_fake_server()
+    try:
+        service = _make_service(server)
+        deployment_id = deployment_storage.create_deployment("https://github.com/a/b", "dev", "test")
+
+        # Lines 1-3 belong to the service's previous build
+        FAKE_LOGS[:] = [_log_line(n, f"2026-01-01T00:00:{n:02d}Z") for n in range(1, 7)]
+        FAKE_DEPLOY["createdAt"] = "2026-01-01T00:00:04Z"
+        url = asyncio.run(service._wait_for_deployment("srv-1", "dep-1", deployment_id, ("https://github.com/a/b", "logs-test", "dev")))
+
+        assert url == "https://b.onrender.com"
+        assert _provider_messages(deployment_id) == [f"build line {n}" for n in range(4, 7)]
+        assert PAGE_REQUESTS[-1]["startTime"] == "2026-01-01T00:00:04Z"
+        print("✅ Build output starts at the deploy's creation")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    print("🧪 Testing Render build log ingestion...\n")
+
+    test_incremental_ingestion()
+    test_ingestion_is_capped()
+    test_ingestion_starts_at_deploy()
+    print("\n✨ All build log ingestion tests passed!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test that rollbacks restore the deploy before the one live now.
+Run this to check the Render fallback when a webhook redeploy we never
+recorded is what the service is running.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+class FakeResponse:
+    def __init__(self, status_code: int, data):
+        self.status_code = status_code
+        self._data = data
+        self.text = str(data)
+
+    def json(self):
+        return self._data
+
+def _deploys(*entries):
+    """Render's deploy list (newest first) from (id, status) pairs"""
+    return [{"deploy": {"id": deploy_id, "status": status}, "cursor": deploy_id} for deploy_id, status in entries]
+
+def _find_previous(deploys):
+    import requests
+    from app.services.render_deployment import RenderDeploymentService
+
+    service = RenderDeploymentService()
+    service.render_api_key = "test-key"
+    original_get = requests.get
+    requests.get = lambda url, **kwargs: FakeResponse(200, deploys)
+    try:
+        return asyncio.run(service.find_previous_deploy("srv-1"))
+    finally:
+        requests.get = original_get
+
+def test_previous_deploy_skips_the_live_one():
+    """The live deploy is the current one, so the deploy before it is restored."""
+    # d1 was our deployment; a push then built d2, which went live
+    assert _find_previous(_deploys(("d2", "live"), ("d1", "deactivated"))) == "d1"
+    # Builds newer than the live deploy that never went live are not candidates
+    assert _find_previous(_deploys(("d4", "build_failed"), ("d3", "live"), ("d2", "canceled"), ("d1", "deactivated"))) == "d1"
+    assert _find_previous(_deploys(("d1", "live"))) is None
+    print("✅ Rollback skips the deploy that is live now")
+
+def test_rollback_after_webhook_redeploy():
+    """Rolling back a deployment whose service was redeployed by a push restores its own build."""
+    from app.models.deployment import DeploymentStatus, RollbackRequest
+    from app.services.deploy_service import rollback_deployment
+    from app.services.deployment_storage import deployment_storage
+    from app.services.render_deployment import render_deployment_service
+
+    deployment_id = deployment_storage.create_deployment("https://github.com/acme/rollback", "dev", "deploy")
+    deployment_storage.update_render_service_id(deployment_id, "srv-rollback")
+    deployment_storage.update_render_deploy_id(deployment_id, "d1")
+    deployment_storage.update_deployment_status(deployment_id, DeploymentStatus.completed)
+
+    restored = []
+
+    async def fake_rollback(service_id, render_deploy_id, our_deployment_id, repo_url, environment):
+        restored.append(render_deploy_id)
+        return "https://rollback.onrender.com"
+
+    import requests
+    original_get, original_key = requests.get, render_deployment_service.render_api_key
+    # A push built d2 on the service after our deployment's d1; the record still says d1
+    requests.get = lambda url, **kwargs: FakeResponse(200, _deploys(("d2", "live"), ("d1", "deactivated")))
+    render_deployment_service.render_api_key = "test-key"
+    render_deployment_service.rollback_service = fake_rollback
+    try:
+        response = asyncio.run(rollback_deployment(RollbackRequest(deployment_id=deployment_id)))
+    finally:
+        requests.get = original_get
+        render_deployment_service.render_api_key = original_key
+        del render_deployment_service.rollback_service
+
+    assert response.status == "success"
+    assert restored == ["d1"]
+    print("✅ Rollback restores the build before the webhook redeploy")
+
+if __name__ == "__main__":
+    print("🧪 Testing rollbacks...\n")
+
+    test_previous_deploy_skips_the_live_one()
+    test_rollback_after_webhook_redeploy()
+    print("\n✨ All rollback tests passed!")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Cold-start budget check for the backend.
+Importing app.main must stay under the import-time budget and must not pull in
+heavy dependencies that are only needed once a request arrives.
+"""
+
+import os
+import sys
+import subprocess
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), 'backend')
+
+# Cumulative import time allowed for app.main, in milliseconds
+IMPORT_BUDGET_MS = int(os.getenv("IMPORT_BUDGET_MS", "1000"))
+
+# Modules that must be imported lazily, on first use
+LAZY_MODULES = ["openai", "requests"]
+
+def measure_imports():
+    """Import app.main under -X importtime and return {module: cumulative microseconds}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[module.strip()] = int(cumulative)
+    return timings
+
+def test_heavy_modules_are_lazy():
+    timings = measure_imports()
+    for module in LAZY_MODULES:
+        assert module not in timings, f"{module} is imported at startup"
+
+def test_import_time_budget():
+    timings = measure_imports()
+    elapsed_ms = timings["app.main"] / 1000
+    print(f"app.main imported in {elapsed_ms:.0f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    assert elapsed_ms < IMPORT_BUDGET_MS, f"app.main took {elapsed_ms:.0f} ms to import"
+
+if __name__ == "__main__":
+    print("🧪 Checking cold-start budget...\n")
+    test_heavy_modules_are_lazy()
+    print("✅ Heavy dependencies are imported lazily")
+    test_import_time_budget()
+    print("✅ Import time is within budget")